@@ -0,0 +1,137 @@
+"""
+Benchmark of the scaling of a run of the xml-parser in the number of files.
+
+Synthetic xml-files (see generate_logs.py) are parsed by the XmlParser (real parse path: parsing, scoring,
+collecting the rows of all files and writing the output files) for N, 2N, 4N, ... files. If a run is linear in the
+number of files, the time per file stays constant and the time doubles with the number of files (ratio ~2.0).
+A larger ratio points to work, which grows with the rows collected so far (e.g., copying whole columns per file).
+For comparison, the row accumulator alone and the former approach (pd.concat of one-row data frames) are timed.
+
+Run from the root of the repository, e.g.:
+    python benchmarks/bench_accumulator.py --files 200 --doublings 3 --max-ratio 2.5
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from generate_logs import generate
+
+# xml_parser.py is in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import xml_parser  # noqa: E402
+
+ACTION_COLUMNS = ["ID", "Item", "Date", "Test", "TimeAfterOnset", "Phase", "Round", "Action", "SpecificAction"]
+ROWS_PER_FILE = 60
+ITEMS = 5
+
+
+def run_parser(n_files, rounds):
+    """
+    Generates n_files xml-files and times a run of the XmlParser on them.
+
+    @:return: seconds of the run and number of action rows
+    """
+    directory = tempfile.mkdtemp(prefix="bench_scaling_")
+    try:
+        _, num_actions = generate(os.path.join(directory, "data", "synthetic"), participants=n_files // ITEMS,
+                                  items=ITEMS, rounds=rounds)
+
+        start = time.perf_counter()
+        # output of the scoring (one line per round and file) is not part of the benchmark
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            xml_parser.XmlParser(inp="synthetic", out=os.path.join(directory, "out"), subset_tasks=False,
+                                 data_dir=os.path.join(directory, "data"), info_dir=directory)
+        return time.perf_counter() - start, num_actions
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def file_rows(file_number):
+    """
+    Returns rows as created for one (simulated) file.
+    """
+    rows = []
+    for i in range(ROWS_PER_FILE):
+        rows.append({"ID": "U%05d" % (file_number // 10), "Item": "Item%d" % (file_number % 10), "Test": "Bench",
+                     "Date": None, "TimeAfterOnset": i * 1.5, "Phase": "exploration" if i < 50 else "control",
+                     "Round": i, "Action": "PressApply", "SpecificAction": "Execute", "strategy": "VOTAT",
+                     "ExoA": 1, "ExoB": 0, "EndoA": i, "EndoB": -i})
+    return rows
+
+
+def run_accumulator(n_files):
+    accumulator = xml_parser.RowAccumulator(ACTION_COLUMNS, categories=["ID", "Item", "Test", "Phase", "Action"])
+    for file_number in range(n_files):
+        for row in file_rows(file_number):
+            accumulator.append(row)
+    return accumulator.to_frame()
+
+
+def run_concat(n_files):
+    df = pd.DataFrame(columns=ACTION_COLUMNS)
+    for file_number in range(n_files):
+        for row in file_rows(file_number):
+            df = pd.concat([df, pd.DataFrame.from_dict(row, orient="index").T], ignore_index=True)
+    return df
+
+
+def timed(function, n_files):
+    start = time.perf_counter()
+    function(n_files)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Benchmark of the scaling of a run in the number of files.")
+    arg_parser.add_argument("--files", type=int, default=200, help="smallest number of files N (default: 200)")
+    arg_parser.add_argument("--doublings", type=int, default=2, help="runs with 2N, 4N, ... files (default: 2)")
+    arg_parser.add_argument("--rounds", type=int, default=30, help="mean number of rounds in exploration phase")
+    arg_parser.add_argument("--max-ratio", type=float, default=None,
+                            help="exit with code 1 if the time of a run grows more than this factor when the number "
+                                 "of files is doubled (e.g., 2.5)")
+    arg_parser.add_argument("--accumulator", action="store_true",
+                            help="also time the row accumulator alone and pd.concat on simulated rows")
+    args = arg_parser.parse_args()
+
+    print("# real parse path (XmlParser incl. output files)")
+    print(f"{'files':>8} {'actions':>9} {'run [s]':>10} {'ms/file':>8} {'ratio':>7}")
+
+    max_ratio = 0.0
+    last_seconds = None
+    for n_files in [args.files * 2 ** i for i in range(args.doublings + 1)]:
+        seconds, num_actions = run_parser(n_files, args.rounds)
+        ratio = seconds / last_seconds if last_seconds is not None else None
+        max_ratio = max(max_ratio, ratio or 0.0)
+        last_seconds = seconds
+
+        print(f"{n_files:>8} {num_actions:>9} {seconds:>10.3f} {1000 * seconds / n_files:>8.3f} "
+              f"{f'{ratio:.2f}' if ratio is not None else '-':>7}")
+
+    print("\nratio = time / time with half the files; ~2.0 if the run is linear in the number of files.")
+
+    if args.accumulator:
+        print(f"\n# simulated rows\n{'files':>8} {'rows':>9} {'accumulator [s]':>16} {'ms/file':>8} "
+              f"{'pd.concat [s]':>14} {'ms/file':>8}")
+
+        for n_files in [50, 100, 200, 400, 800, 1600, 3200]:
+            seconds = timed(run_accumulator, n_files)
+            line = f"{n_files:>8} {n_files * ROWS_PER_FILE:>9} {seconds:>16.3f} {1000 * seconds / n_files:>8.3f}"
+
+            if n_files <= 100:
+                seconds_concat = timed(run_concat, n_files)
+                line += f" {seconds_concat:>14.3f} {1000 * seconds_concat / n_files:>8.3f}"
+            else:
+                line += f" {'-':>14} {'-':>8}"
+
+            print(line)
+
+    if args.max_ratio is not None and max_ratio > args.max_ratio:
+        print(f"\nFAILED: time grows by {max_ratio:.2f} when the number of files is doubled (> {args.max_ratio})")
+        sys.exit(1)
@@ -0,0 +1,208 @@
+"""
+Benchmark of the stages of the xml-parser on synthetic xml-files (see generate_logs.py).
+
+Stages:
+    select      glob of the xml-files and selection of tasks (select_files)
+    parse       reading the xml-files and iterating over all log entries (engine only)
+    score       parse_xml_file (reading + scoring); the time of the parse stage is subtracted
+    aggregate   collecting the rows of all files and building the data frames (actions, long, wide)
+    save        writing the data frames (csv and further formats if given)
+
+For each stage and engine, the time, files/sec, events/sec (events = rows of the action data) and the peak RSS
+of the process at the end of the stage (including worker processes) are reported. Before the stages of an engine
+are timed, the first files are parsed once untimed (see warm_up), so that one-off costs (e.g., importing pandas and
+lxml) are not charged to the engine which runs first. The same seed always gives the same files, so runs can be
+compared before and after a change.
+
+Run from the root of the repository, e.g.:
+    python benchmarks/bench_stages.py --participants 50 --items 5 --rounds 40 --engine etree iterparse
+"""
+
+import argparse
+import contextlib
+import functools
+import glob
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_logs import generate
+
+# xml_parser.py is in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import xml_parser  # noqa: E402
+
+STAGES = ["select", "parse", "score", "aggregate", "save"]
+WARMUP_FILES = 10
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size in MB of this process and (if any) its worker processes.
+    """
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is given in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+def read_entries(path, engine):
+    """
+    Reads one xml-file and iterates over all log entries (without scoring).
+    """
+    log = xml_parser.ENGINES[engine](path)
+    return sum(1 for _ in log.entries())
+
+
+def stage_select(directory):
+    files = glob.glob(os.path.join(directory, "*_scoring.xml"))
+    # all items of the files are selected (as with a tasks.csv listing all items)
+    tasks = sorted({os.path.basename(path)[:-len("_scoring.xml")].split("_")[-1] for path in files})
+    return xml_parser.select_files(sorted(files), tasks=tasks)
+
+
+def stage_parse(files, engine, workers):
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(functools.partial(read_entries, engine=engine), files,
+                                chunksize=max(1, len(files) // (workers * 4))))
+    return sum(read_entries(path, engine) for path in files)
+
+
+def stage_score(files, engine, workers):
+    # output of parse_xml_file (one line per strategy and file) is not part of the benchmark
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(functools.partial(xml_parser._parse_file_worker, engine=engine, quiet=True),
+                                        files, chunksize=max(1, len(files) // (workers * 4))))
+        else:
+            results = [xml_parser.parse_xml_file(path, engine=engine, quiet=True) for path in files]
+
+    for result in results:
+        if result.error is not None:
+            raise RuntimeError(f"{result.path} could not be parsed:\n{result.error}")
+    return results
+
+
+def stage_aggregate(results):
+    actions = xml_parser.action_accumulator()
+    long = xml_parser.long_accumulator()
+    for result in results:
+        actions.extend(result.actions)
+        long.extend(result.long)
+
+    df_actions = actions.to_frame()
+    df_actions.sort_values(by=["ID", "Item", "TimeAfterOnset"], inplace=True)
+    df_long = long.to_frame()
+    df_wide = xml_parser.build_wide(df_long)
+    return df_actions, df_long, df_wide
+
+
+def stage_save(frames, out, output_formats):
+    df_actions, df_long, df_wide = frames
+    for output_format in output_formats:
+        for df, name, schema, partition_cols in [(df_long, "long", xml_parser.LONG_SCHEMA, None),
+                                                 (df_wide, "wide", dict(), None),
+                                                 (df_actions, "actions", xml_parser.ACTION_SCHEMA, ["Test", "Item"])]:
+            path = os.path.join(out, f"bench_{name}.{output_format}")
+            if output_format == "csv":
+                df.to_csv(path, index=False)
+            else:
+                xml_parser.write_columnar(xml_parser.apply_schema(df, schema), path, output_format,
+                                          partition_cols=partition_cols)
+
+
+def warm_up(files, engine):
+    """
+    Runs the stages parse, score and aggregate on the first files without timing them (imports of pandas and lxml,
+    item models of the first files), so that all engines are timed under the same conditions.
+    """
+    stage_parse(files[:WARMUP_FILES], engine, 1)
+    stage_aggregate(stage_score(files[:WARMUP_FILES], engine, 1))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start, peak_rss()
+
+
+def run(directory, engine, workers, output_formats):
+    """
+    Runs all stages once and returns {stage: (seconds, peak RSS in MB)}, the number of files and of events.
+    """
+    stats = dict()
+    out = tempfile.mkdtemp(prefix="bench_out_")
+
+    try:
+        files, seconds, rss = timed(stage_select, directory)
+        stats["select"] = (seconds, rss)
+
+        warm_up(files, engine)
+
+        _, seconds, rss = timed(stage_parse, files, engine, workers)
+        stats["parse"] = (seconds, rss)
+
+        results, seconds, rss = timed(stage_score, files, engine, workers)
+        stats["score"] = (max(0.0, seconds - stats["parse"][0]), rss)
+
+        frames, seconds, rss = timed(stage_aggregate, results)
+        stats["aggregate"] = (seconds, rss)
+
+        _, seconds, rss = timed(stage_save, frames, out, output_formats)
+        stats["save"] = (seconds, rss)
+
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+
+    return stats, len(files), len(frames[0])
+
+
+def report(engine, stats, num_files, num_events):
+    print(f"\n# engine: {engine}, {num_files} files, {num_events} events")
+    print(f"{'stage':<10} {'seconds':>9} {'files/s':>10} {'events/s':>12} {'peak RSS [MB]':>14}")
+
+    for stage in STAGES:
+        seconds, rss = stats[stage]
+        files_per_second = num_files / seconds if seconds > 0 else float("inf")
+        events_per_second = num_events / seconds if seconds > 0 else float("inf")
+        print(f"{stage:<10} {seconds:>9.3f} {files_per_second:>10.1f} {events_per_second:>12.0f} {rss:>14.1f}")
+
+    total = sum(seconds for seconds, _ in stats.values())
+    print(f"{'total':<10} {total:>9.3f} {num_files / total:>10.1f} {num_events / total:>12.0f}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Benchmark of the stages of the xml-parser.")
+    arg_parser.add_argument("--data", default=None, metavar="DIR",
+                            help="directory with xml-files (default: synthetic files in a temporary directory)")
+    arg_parser.add_argument("--participants", type=int, default=20)
+    arg_parser.add_argument("--items", type=int, default=5)
+    arg_parser.add_argument("--rounds", type=int, default=30, help="mean number of rounds in exploration phase")
+    arg_parser.add_argument("--eigendynamics", type=float, default=0.3)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--engine", nargs="+", choices=list(xml_parser.ENGINES), default=["etree"])
+    arg_parser.add_argument("--workers", type=int, default=1)
+    arg_parser.add_argument("--format", nargs="+", choices=xml_parser.OUTPUT_FORMATS, default=["csv"])
+    args = arg_parser.parse_args()
+
+    data = args.data
+    if data is None:
+        data = tempfile.mkdtemp(prefix="bench_data_")
+        num_files, num_actions = generate(data, participants=args.participants, items=args.items,
+                                          rounds=args.rounds, eigendynamics=args.eigendynamics, seed=args.seed)
+        print(f"# {num_files} synthetic files with {num_actions} actions (seed {args.seed})")
+
+    try:
+        for engine in args.engine:
+            report(engine, *run(data, engine, args.workers, args.format))
+    finally:
+        if args.data is None:
+            shutil.rmtree(data, ignore_errors=True)
+
+    print("\npeak RSS is the maximum of the process (and worker processes) up to the end of the stage.")
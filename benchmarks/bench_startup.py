@@ -0,0 +1,91 @@
+"""
+Benchmark of the startup time of the command line of the xml-parser (e.g., for many calls from job schedulers).
+
+The commands --help and select (dry run, on synthetic xml-files, see generate_logs.py) are run repeatedly as new
+processes and the minimum and median time are reported, along with the startup time of the interpreter alone.
+Both commands must not import pandas, numpy or lxml (checked with 'python -X importtime'), which take most of the
+startup time otherwise. The script exits with code 1 if a heavy module is imported or if the median time of a
+command exceeds --max-ms, hence it can be used as a check before a commit.
+
+Run from the root of the repository, e.g.:
+    python benchmarks/bench_startup.py --repeat 20 --max-ms 150
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_logs import generate
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "xml-parser.py")
+
+# modules which must not be imported for --help and select
+HEAVY_MODULES = ("pandas", "numpy", "lxml", "pyarrow")
+
+
+def time_command(command, repeat):
+    """
+    Runs the command 'repeat' times and returns the times in milliseconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def heavy_imports(command):
+    """
+    Returns the heavy modules (see HEAVY_MODULES) imported by the command.
+    """
+    process = subprocess.run([command[0], "-X", "importtime", *command[1:]], check=True, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True)
+    imported = {line.split("|")[-1].strip().split(".")[0] for line in process.stderr.splitlines()
+                if line.startswith("import time:")}
+    return sorted(imported.intersection(HEAVY_MODULES))
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Benchmark of the startup time of the xml-parser.")
+    arg_parser.add_argument("--repeat", type=int, default=10, help="number of runs of each command")
+    arg_parser.add_argument("--max-ms", type=float, default=None,
+                            help="maximal median time of a command in milliseconds (default: no limit)")
+    arg_parser.add_argument("--participants", type=int, default=100)
+    arg_parser.add_argument("--items", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    data = tempfile.mkdtemp(prefix="bench_data_")
+    try:
+        # only names of the files are read by select, hence files are kept short
+        num_files, _ = generate(os.path.join(data, "synthetic"), participants=args.participants, items=args.items,
+                                rounds=1, control_rounds=1)
+
+        commands = {"python -c pass": [sys.executable, "-c", "pass"],
+                    "--help": [sys.executable, SCRIPT, "--help"],
+                    "select": [sys.executable, SCRIPT, "select", "--data-dir", data, "--input", "synthetic",
+                               "--all-tasks", "--count"]}
+
+        print(f"# {args.repeat} runs of each command, select on {num_files} files")
+        print(f"{'command':<16} {'min [ms]':>10} {'median [ms]':>12}  heavy imports")
+
+        failed = False
+        for name, command in commands.items():
+            times = time_command(command, args.repeat)
+            median = statistics.median(times)
+            heavy = heavy_imports(command) if name != "python -c pass" else []
+            print(f"{name:<16} {min(times):>10.1f} {median:>12.1f}  {', '.join(heavy) or '-'}")
+
+            if heavy or (args.max_ms is not None and name != "python -c pass" and median > args.max_ms):
+                failed = True
+    finally:
+        shutil.rmtree(data, ignore_errors=True)
+
+    if failed:
+        print("\nFAILED: a command imports heavy modules or exceeds --max-ms")
+        sys.exit(1)
@@ -0,0 +1,202 @@
+"""
+Generator of synthetic xml-files of MicroDYN items (CBA ItemBuilder) for benchmarks of the xml-parser.
+
+The files have the structure expected by parse_xml_file: properties and designMicrodynModel in the first log entry,
+time stamps with log entries of actions (Execute with values of Exo/Endo variables, added/removed dependencies,
+buttons), the runtimeMicrodynModel in the last log entry and the microdynOverview. Files are named
+'[ID]_[Item]_scoring.xml'. The same seed always gives the same files.
+
+Run from the root of the repository, e.g.:
+    python benchmarks/generate_logs.py --out data/synthetic --participants 100 --items 10 --rounds 40
+"""
+
+import argparse
+import datetime
+import os
+import random
+
+XSI = "http://www.w3.org/2001/XMLSchema-instance"
+CBA = "http://www.softcon.de/cbaloggingmodel"
+
+ITEM_NAMES = ["Lemonade", "Cat", "Moped", "Handball", "Gardening", "Bakery", "Aquarium", "Chemistry", "Garden",
+              "Concert", "Fishing", "Kiosk", "Medicine", "Plant", "Rocket", "Weather"]
+EXO_NAMES = ["ExoA", "ExoB", "ExoC"]
+ENDO_NAMES = ["EndoA", "EndoB", "EndoC"]
+
+
+class ItemModel:
+    """
+    Random model of one item: exo and endo variables, dependencies (exo -> endo), eigendynamics (addend != 0)
+    and target values for the control phase.
+    """
+
+    def __init__(self, name, rnd, eigendynamics=0.3):
+        self.name = name
+        self.num_exo = rnd.choice([2, 3, 3])
+        self.num_endo = rnd.choice([2, 3, 3])
+        self.exo = [(f"x{i}", EXO_NAMES[i]) for i in range(self.num_exo)]
+        self.endo = [(f"y{i}", ENDO_NAMES[i]) for i in range(self.num_endo)]
+
+        # dependencies with factor != 1 are 'real' dependencies, factor 1 is the identity of endo variables
+        self.dependencies = []
+        for source, _ in self.exo:
+            for target, _ in self.endo:
+                if rnd.random() < 0.4:
+                    self.dependencies.append((source, target, rnd.choice([2, 3, -2])))
+        for target, _ in self.endo:
+            self.dependencies.append((target, target, 1))
+
+        self.addends = {target: (rnd.choice([2, -1]) if rnd.random() < eigendynamics else 0) for target, _ in
+                        self.endo}
+        self.targets = {target: (rnd.randint(5, 20), rnd.randint(21, 30)) for target, _ in self.endo}
+
+
+def time_stamp(time):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.") + "%03d" % (time.microsecond // 1000) + "+0200"
+
+
+def log_entry(lines, time, content):
+    lines.append(f'<logEntry xsi:type="cbaloggingmodel:LogEntryTimeStamp" timeStamp="{time_stamp(time)}">')
+    lines.extend(content)
+    lines.append('</logEntry>')
+
+
+def write_file(path, user, model, test, rounds, control_rounds, rnd, start):
+    """
+    Writes the xml-file of one user x one item.
+
+    @:return: number of log entries of actions in the file
+    """
+    time = start
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<cbaloggingmodel:TraceLog xmlns:xsi="{XSI}" xmlns:cbaloggingmodel="{CBA}">',
+             '<tracesOverview>']
+
+    # properties + model
+    design = [f'<logEntry xsi:type="cbaloggingmodel:ItemStartLogEntry" user="{user}" test="{test}" '
+              f'entryPoint="{model.name}">', '<designMicrodynModel>']
+    for variable_id, name in model.exo:
+        design.append(f'<variable id="{variable_id}" userDefinedId="{name}" addend="0"/>')
+    for variable_id, name in model.endo:
+        target_value, target_limit = model.targets[variable_id]
+        design.append(f'<variable id="{variable_id}" userDefinedId="{name}" addend="{model.addends[variable_id]}" '
+                      f'targetValue="{target_value}" targetLimit="{target_limit}"/>')
+    for source, target, factor in model.dependencies:
+        design.append(f'<dependency sourceId="{source}" targetId="{target}" factor="{factor}"/>')
+    design.extend(['</designMicrodynModel>', '</logEntry>'])
+    log_entry(lines, time, design)
+
+    # instruction and start of the item (start time is taken from the third log entry)
+    for button in ["Start", "Start"]:
+        time += datetime.timedelta(seconds=rnd.randint(5, 30))
+        log_entry(lines, time, [f'<logEntry xsi:type="cbaloggingmodel:ButtonLogEntry" id="{button}"/>'])
+
+    num_actions = 0
+    values = {variable_id: 0 for variable_id, _ in model.endo}
+
+    for phase, num_rounds in (("exploration", rounds), ("control", control_rounds)):
+        for _ in range(num_rounds):
+            time += datetime.timedelta(milliseconds=rnd.randint(300, 8000))
+            kind = rnd.random()
+
+            if phase == "exploration" and kind < 0.15:
+                entry_type = "MicroDynAddDependencyLogEntry" if rnd.random() < 0.7 else \
+                    "MicroDynRemoveDependencyLogEntry"
+                source = rnd.choice(model.exo)[0]
+                target = rnd.choice(model.endo)[0]
+                content = [f'<logEntry xsi:type="cbaloggingmodel:{entry_type}" phase="{phase}" '
+                           f'sourceId="{source}" destinationId="{target}"/>']
+            elif kind < 0.2:
+                content = [f'<logEntry xsi:type="cbaloggingmodel:ButtonLogEntry" id="Reset" phase="{phase}"/>']
+            elif kind < 0.23:
+                content = [f'<logEntry xsi:type="cbaloggingmodel:ButtonLogEntry" id="Help" phase="{phase}"/>']
+            else:
+                # mostly VOTAT, but also other strategies
+                exo_values = [0] * model.num_exo
+                for i in rnd.sample(range(model.num_exo), rnd.choice([0, 1, 1, 1, 2, model.num_exo])):
+                    exo_values[i] = rnd.choice([1, 2, -1, -2])
+
+                for variable_id, _ in model.endo:
+                    values[variable_id] += model.addends[variable_id]
+                for source, target, factor in model.dependencies:
+                    if factor != 1:
+                        values[target] += factor * exo_values[int(source[1:])]
+
+                content = [f'<logEntry xsi:type="cbaloggingmodel:MicroDynButtonPressLogEntry" phase="{phase}" '
+                           f'button="Execute">']
+                content += [f'<variable userDefinedId="{name}" value="{exo_values[i]}"/>' for i, (_, name) in
+                            enumerate(model.exo)]
+                content += [f'<variable userDefinedId="{name}" value="{values[variable_id]}"/>' for variable_id, name
+                            in model.endo]
+                content.append('</logEntry>')
+
+            log_entry(lines, time, content)
+            num_actions += 1
+
+    # given response of exploration phase
+    time += datetime.timedelta(seconds=1)
+    response = ['<logEntry xsi:type="cbaloggingmodel:ItemEndLogEntry">', '<runtimeMicrodynModel>']
+    for source, target, factor in model.dependencies:
+        if factor != 1 and rnd.random() < 0.8:
+            response.append(f'<dependency sourceId="{source}" targetId="{target}"/>')
+    for target, addend in model.addends.items():
+        if addend != 0 and rnd.random() < 0.8:
+            response.append(f'<dependency sourceId="{target}" targetId="{target}"/>')
+    response.extend(['</runtimeMicrodynModel>', '</logEntry>'])
+    log_entry(lines, time, response)
+
+    lines.append('</tracesOverview>')
+    lines.append(f'<microdynOverview explorationTime="{rnd.randint(60, 180)}" controlTime="{rnd.randint(30, 120)}" '
+                 f'explorationNbReset="{rnd.randint(0, 3)}"/>')
+    lines.append('</cbaloggingmodel:TraceLog>')
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+    return num_actions
+
+
+def generate(out, participants=20, items=5, rounds=30, control_rounds=4, eigendynamics=0.3, seed=1, test="Synthetic"):
+    """
+    Writes participants x items xml-files to the directory 'out'.
+
+    @:return: number of files and number of log entries of actions
+    """
+    rnd = random.Random(seed)
+    models = [ItemModel(name, rnd, eigendynamics) for name in (ITEM_NAMES * (items // len(ITEM_NAMES) + 1))[:items]]
+    start = datetime.datetime(2016, 5, 10, 8, 0, 0)
+
+    os.makedirs(out, exist_ok=True)
+
+    num_files = 0
+    num_actions = 0
+    for participant in range(participants):
+        user = f"{100000 + participant}"
+        for model in models:
+            path = os.path.join(out, f"{user}_{model.name}_scoring.xml")
+            this_start = start + datetime.timedelta(minutes=participant * 30, milliseconds=rnd.randint(0, 999))
+            # number of rounds varies between participants
+            this_rounds = max(1, int(rnd.gauss(rounds, rounds / 4)))
+            num_actions += write_file(path, user, model, test, this_rounds, control_rounds, rnd, this_start)
+            num_files += 1
+
+    return num_files, num_actions
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Writes synthetic xml-files of MicroDYN items.")
+    arg_parser.add_argument("--out", default=os.path.join("data", "synthetic"), help="output directory")
+    arg_parser.add_argument("--participants", type=int, default=20)
+    arg_parser.add_argument("--items", type=int, default=5)
+    arg_parser.add_argument("--rounds", type=int, default=30, help="mean number of rounds in exploration phase")
+    arg_parser.add_argument("--control-rounds", type=int, default=4)
+    arg_parser.add_argument("--eigendynamics", type=float, default=0.3,
+                            help="probability of eigendynamics for each endo variable")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--test", default="Synthetic", help="name of the test")
+    args = arg_parser.parse_args()
+
+    files, actions = generate(args.out, participants=args.participants, items=args.items, rounds=args.rounds,
+                              control_rounds=args.control_rounds, eigendynamics=args.eigendynamics, seed=args.seed,
+                              test=args.test)
+    print(f"# {files} files with {actions} actions written to {args.out}")
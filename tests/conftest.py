@@ -0,0 +1,12 @@
+"""
+The module xml_parser (root of the repository) and the generator of synthetic xml-files (benchmarks) are imported
+by the tests.
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
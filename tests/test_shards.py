@@ -0,0 +1,72 @@
+"""
+Sharded runs: N shards are parsed as separate processes (as on N nodes) and merged; the output files must be the
+same as the output files of a single run. Only csv-files are compared: pyarrow may abort at the exit of a process
+after writing parquet or feather datasets, which would make this test fail at random.
+"""
+
+import filecmp
+import os
+import subprocess
+import sys
+
+import pytest
+
+from generate_logs import generate
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+SCRIPT = os.path.join(ROOT, "xml-parser.py")
+
+NUM_SHARDS = 3
+
+
+def run(directory, *args):
+    return subprocess.run([sys.executable, SCRIPT, *args, "--data-dir", "data", "-i", "synthetic", "--all-tasks"],
+                          cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+@pytest.fixture(scope="module")
+def study(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("study")
+    generate(str(directory / "data" / "synthetic"), participants=8, items=4, rounds=10, seed=3)
+    return directory
+
+
+def test_merged_shards_as_single_run(study):
+    single = run(study, "parse", "--out", "single", "--wide")
+    assert single.returncode == 0, single.stderr
+
+    shards = [subprocess.Popen([sys.executable, SCRIPT, "parse", "--data-dir", "data", "-i", "synthetic",
+                                "--all-tasks", "--out", "sharded", "--shard", f"{i}/{NUM_SHARDS}"],
+                               cwd=study, stdout=subprocess.DEVNULL) for i in range(NUM_SHARDS)]
+    assert [shard.wait() for shard in shards] == [0] * NUM_SHARDS
+
+    merged = run(study, "merge", "--out", "sharded", "--wide")
+    assert merged.returncode == 0, merged.stderr
+
+    for name in ["Synthetic_actions.csv", "Synthetic_aggregated_long.csv", "Synthetic_aggregated_wide.csv"]:
+        assert filecmp.cmp(study / "single" / name, study / "sharded" / name, shallow=False), name
+
+
+def test_merge_with_streamed_actions(study):
+    single = run(study, "parse", "--out", "reference", "--wide")
+    assert single.returncode == 0, single.stderr
+
+    for i in range(NUM_SHARDS):
+        shard = run(study, "parse", "--out", "streamed", "--shard", f"{i}/{NUM_SHARDS}")
+        assert shard.returncode == 0, shard.stderr
+
+    merged = run(study, "merge", "--out", "streamed", "--wide", "--stream-actions")
+    assert merged.returncode == 0, merged.stderr
+    assert not os.path.exists(study / "streamed" / ".actions_shards")
+
+    for name in ["Synthetic_actions.csv", "Synthetic_aggregated_long.csv", "Synthetic_aggregated_wide.csv"]:
+        assert filecmp.cmp(study / "reference" / name, study / "streamed" / name, shallow=False), name
+
+
+def test_merge_with_missing_shard(study):
+    shard = run(study, "parse", "--out", "incomplete", "--shard", f"0/{NUM_SHARDS}")
+    assert shard.returncode == 0, shard.stderr
+
+    merged = run(study, "merge", "--out", "incomplete")
+    assert merged.returncode != 0
+    assert "are missing" in merged.stderr
@@ -0,0 +1,128 @@
+"""
+Strategies coded for all rounds at once (code_strategies, count_votat_variables) are compared with the former
+classifier, which coded one round after another while iterating through the log entries.
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+import xml_parser
+from generate_logs import generate
+
+
+def baseline_strategy(this_exo_values):
+    """
+    Former classifier of one round (handle_press_apply before strategies were coded per file).
+    """
+    num_zeros = this_exo_values.count(0)
+    max_len = len(this_exo_values)
+
+    if num_zeros == max_len:
+        return "NOTAT"
+    elif num_zeros == max_len - 1:
+        return "VOTAT"
+    elif num_zeros == 0:
+        return "CA"
+    elif max_len > 2 and num_zeros == 1:
+        return "HOTAT"
+    return np.NaN
+
+
+def baseline_votat_variables(rounds, phases):
+    """
+    Former count of variables with VOTAT in exploration phase (rounds with VOTAT were collected in votat_array).
+    """
+    votat_array = [values for values, phase in zip(rounds, phases)
+                   if phase == "exploration" and baseline_strategy(values) == "VOTAT"]
+    return np.count_nonzero(np.absolute(np.array(votat_array)).sum(axis=0))
+
+
+def missing_as_none(values):
+    return [None if value is None or (isinstance(value, float) and math.isnan(value)) else value
+            for value in values]
+
+
+def vectorised(rounds, num_variables, phases):
+    exo_values = np.array(rounds, dtype=np.int64).reshape(len(rounds), num_variables)
+    strategies = xml_parser.code_strategies(exo_values)
+    return strategies, xml_parser.count_votat_variables(exo_values, strategies, phases)
+
+
+CASES = {
+    # no round with VOTAT (NOTAT, HOTAT, CA and one round without strategy)
+    "no_votat": ([[0, 0, 0, 0], [1, 1, 1, 0], [2, -1, 1, 1], [1, 1, 0, 0]], ["exploration"] * 4),
+    # all variables changed, with two and three variables
+    "all_changed_3": ([[1, 2, -1], [-2, -2, -2]], ["exploration", "control"]),
+    "all_changed_2": ([[1, 1], [2, -1]], ["exploration", "exploration"]),
+    # round after a reset (all variables at zero), VOTAT before and after
+    "reset": ([[1, 0, 0], [0, 0, 0], [0, 2, 0], [0, 0, -1]], ["exploration"] * 4),
+    # VOTAT in control phase is not counted
+    "votat_control": ([[1, 0], [0, 1]], ["exploration", "control"]),
+    "four_variables": ([[1, 1, 0, 0], [1, 1, 1, 0], [0, 0, 0, 3]], ["exploration"] * 3),
+}
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_same_strategies_as_baseline(name):
+    rounds, phases = CASES[name]
+    strategies, votat_variables = vectorised(rounds, len(rounds[0]), phases)
+
+    assert missing_as_none(strategies) == missing_as_none([baseline_strategy(values) for values in rounds])
+    assert votat_variables == baseline_votat_variables(rounds, phases)
+
+
+def test_no_rounds():
+    strategies, votat_variables = vectorised([], 3, [])
+    assert len(strategies) == 0
+    assert votat_variables == 0
+
+
+def test_random_rounds_as_baseline():
+    rnd = random.Random(1)
+    for _ in range(500):
+        num_variables = rnd.randint(1, 5)
+        num_rounds = rnd.randint(1, 20)
+        rounds = [[rnd.choice([0, 0, 0, 1, -1, 2]) for _ in range(num_variables)] for _ in range(num_rounds)]
+        phases = [rnd.choice(["exploration", "control"]) for _ in range(num_rounds)]
+        strategies, votat_variables = vectorised(rounds, num_variables, phases)
+
+        assert missing_as_none(strategies) == missing_as_none([baseline_strategy(values) for values in rounds])
+        assert votat_variables == baseline_votat_variables(rounds, phases)
+
+
+def test_strategies_of_actions_as_baseline(tmp_path):
+    """
+    Strategy of each action in parsed files (incl. 'Reset' and changed dependencies, which keep the strategy of the
+    last round or have none) and VOTAT_x_vars are the same as with the former classifier.
+    """
+    generate(str(tmp_path), participants=3, items=4, rounds=25, seed=7)
+
+    for path in sorted(tmp_path.glob("*_scoring.xml")):
+        result = xml_parser.parse_xml_file(str(path), quiet=True)
+        rows = list(result.actions.records())
+        exo_variables = [column for column in result.actions.columns if "Exo" in column]
+
+        strategy = None
+        expected = []
+        rounds, phases = [], []
+        for row in rows:
+            if row["Action"] == "PressApply" and row["SpecificAction"] == "Execute" and \
+                    row["Phase"] in xml_parser.SCORED_PHASES:
+                values = [int(row[exo]) for exo in exo_variables]
+                strategy = baseline_strategy(values)
+                rounds.append(values)
+                phases.append(row["Phase"])
+            elif row["Action"] in ("AddDependency", "RemoveDependency"):
+                strategy = np.NaN
+            elif row["Action"] in ("Start", "EndExploration"):
+                expected.append(None)
+                continue
+            expected.append(strategy)
+
+        assert missing_as_none([row["strategy"] for row in rows]) == missing_as_none(expected), path.name
+
+        exploration = next(row for row in result.long.records() if row["Phase"] == "exploration")
+        assert exploration["VOTAT_x_vars"] == baseline_votat_variables(rounds, phases), path.name
@@ -0,0 +1,3367 @@
+import datetime
+import glob
+import importlib
+import os
+import sys
+import argparse
+import collections
+import copy
+import fnmatch
+import csv
+import heapq
+import itertools
+import hashlib
+import io
+import json
+import re
+import time
+import threading
+from array import array
+
+
+class LazyModule:
+    """
+    Placeholder for a module, which is imported on first access of one of its attributes. Then, the placeholder
+    replaces itself by the module in the globals of this script (hence, later accesses cost nothing). Thus, pandas,
+    numpy, lxml and the modules for archives, caches and process pools are only imported if they are needed, not
+    for --help or the selection of files (see benchmarks/bench_startup.py).
+    """
+
+    def __init__(self, name, alias):
+        """
+        @:param name: name of the module (e.g., 'pandas')
+        @:param alias: name of the module in this script (e.g., 'pd')
+        """
+        self.name = name
+        self.alias = alias
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.name)
+        globals()[self.alias] = module
+        return getattr(module, attribute)
+
+
+etree = LazyModule("lxml.etree", "etree")
+pd = LazyModule("pandas", "pd")
+np = LazyModule("numpy", "np")
+futures = LazyModule("concurrent.futures", "futures")
+pickle = LazyModule("pickle", "pickle")
+shutil = LazyModule("shutil", "shutil")
+tarfile = LazyModule("tarfile", "tarfile")
+traceback = LazyModule("traceback", "traceback")
+zipfile = LazyModule("zipfile", "zipfile")
+
+# version of the parsing and scoring logic: increase when changes alter the extracted data or the layout of
+# results (invalidates cached results, see ResultCache)
+SCORING_VERSION = "3"
+
+# columns of the data frames for actions and aggregated data (long format)
+ACTION_COLUMNS = ["ID", "Item", "Date", "Test",
+                  "TimeAfterOnset", "Phase", "Round",
+                  "Action", "SpecificAction"]
+ACTION_CATEGORIES = ["ID", "Item", "Test", "Phase", "Action", "SpecificAction", "strategy", "ChangeDependency"]
+ACTION_TIMESTAMPS = ["Date"]
+
+LONG_COLUMNS = ["ID", "Item", "Date", "Test",
+                "Phase", "Rounds",
+                "ED", "NumDependencies", "NumInput", "NumOutput",
+                "Time_NoInstr",
+                "Correct",
+                "VOTATfreq", "HOTATfreq", "NOTATfreq", "CAfreq",
+                "VOTAT_x_vars", "fullVOTAT",
+                "StratSeq", "ActionSeq"]
+LONG_CATEGORIES = ["ID", "Item", "Test", "Phase"]
+LONG_TIMESTAMPS = ["Date"]
+
+# dtypes of columns in typed output formats (parquet, feather), see apply_schema
+ACTION_SCHEMA = {"ID": "category", "Item": "category", "Test": "category", "Phase": "category",
+                 "Action": "category", "SpecificAction": "category", "strategy": "category",
+                 "ChangeDependency": "category",
+                 "Date": "datetime64[ns]", "TimeAfterOnset": "float32", "Round": "Int16"}
+
+LONG_SCHEMA = {"ID": "category", "Item": "category", "Test": "category", "Phase": "category",
+               "Date": "datetime64[ns]", "Rounds": "Int16", "ED": "boolean",
+               "NumDependencies": "Int16", "NumInput": "Int16", "NumOutput": "Int16",
+               "Time_NoInstr": "float32", "Correct": "Int8",
+               "VOTATfreq": "Int16", "HOTATfreq": "Int16", "NOTATfreq": "Int16", "CAfreq": "Int16",
+               "VOTAT_x_vars": "Int16", "fullVOTAT": "boolean",
+               "StratSeq": "string", "ActionSeq": "string", "Resets": "Int16"}
+
+# dtype of values of exo and endo variables (columns named like 'ExoA', 'EndoB')
+VARIABLE_DTYPE = "Int32"
+
+OUTPUT_FORMATS = ("csv", "parquet", "feather")
+
+# missing value of time stamps (int64 minimum, which is NaT in numpy/pandas) and of integer columns (int32 minimum)
+MISSING_TIME = -2 ** 63
+MISSING_INT = -2 ** 31
+
+
+def is_integer_action_column(column):
+    """
+    Columns of action data, which are stored as integers: round and values of exo and endo variables.
+    """
+    return column == "Round" or "Exo" in column or "Endo" in column
+
+
+class RowAccumulator:
+    """
+    Column-oriented buffer for the rows of a data frame. Rows are collected as python lists (one per column)
+    instead of concatenating one-row data frames, which made a run quadratic in the number of events. The data
+    frame is only materialised once by calling to_frame().
+
+    Columns listed in 'categories' are stored as integer codes (array of type 'i') with a lookup table of
+    categories; they are materialised as pandas categoricals. Columns listed in 'timestamps' are stored as
+    microseconds since epoch (array of type 'q', see TimestampDecoder) and are materialised as datetime.
+    Integer columns (see 'integers') are stored in arrays of type 'i' (int32) and are materialised as nullable
+    integers (Int32); if a value is not an integer (or too large), the column falls back to a list of python objects.
+    """
+
+    def __init__(self, columns, categories=(), timestamps=(), integers=None):
+        """
+        @:param columns: columns of the data frame (further columns are added when they first appear in a row)
+        @:param categories: columns which are stored as categoricals (e.g., ID, Item, Phase, Action)
+        @:param timestamps: columns which are stored as microseconds since epoch (e.g., Date)
+        @:param integers: function, which returns True for columns stored as integers (see is_integer_action_column)
+        """
+        self.columns = []
+        self.data = dict()
+        self.categories = {column: dict() for column in categories}
+        self.timestamps = set(timestamps)
+        self.is_integer = integers
+        self.integers = set()
+        self.n_rows = 0
+
+        for column in columns:
+            self.add_column(column)
+
+    def __len__(self):
+        return self.n_rows
+
+    def add_column(self, column):
+        """
+        Adds a new column and fills it with missing values for all rows stored so far.
+        """
+        self.columns.append(column)
+        if column in self.categories:
+            self.data[column] = array("i", [-1] * self.n_rows)
+        elif column in self.timestamps:
+            self.data[column] = array("q", [MISSING_TIME] * self.n_rows)
+        elif self.is_integer is not None and self.is_integer(column):
+            self.integers.add(column)
+            self.data[column] = array("i", [MISSING_INT] * self.n_rows)
+        else:
+            self.data[column] = [np.NaN] * self.n_rows
+
+    def append(self, row):
+        """
+        Appends one row (dict: column -> value). Columns not given in the row are filled with missing values.
+        """
+        for column in row:
+            if column not in self.data:
+                self.add_column(column)
+
+        for column in self.columns:
+            value = row.get(column, np.NaN)
+            if column in self.categories:
+                self.data[column].append(self.code(column, value))
+            elif column in self.timestamps:
+                self.data[column].append(MISSING_TIME if pd.isna(value) else value)
+            elif column in self.integers:
+                self.append_integers(column, [value])
+            else:
+                self.data[column].append(value)
+
+        self.n_rows += 1
+
+    def extend(self, other):
+        """
+        Appends all rows of another accumulator (e.g., the rows of one parsed file).
+        """
+        for column in other.columns:
+            if column not in self.data:
+                self.add_column(column)
+
+        for column in self.columns:
+            if column not in other.data:
+                fill = -1 if column in self.categories else MISSING_TIME if column in self.timestamps else \
+                    MISSING_INT if column in self.integers else np.NaN
+                self.data[column].extend([fill] * other.n_rows)
+            elif column in self.categories:
+                # codes of the other accumulator need to be translated into codes of this accumulator
+                lookup = [self.code(column, value) for value in other.categories.get(column, [])]
+                if column in other.categories:
+                    self.data[column].extend([lookup[i] if i >= 0 else -1 for i in other.data[column]])
+                else:
+                    self.data[column].extend([self.code(column, value) for value in other.data[column]])
+            elif column in self.timestamps:
+                values = other.column(column)
+                self.data[column].extend([MISSING_TIME if pd.isna(value) else value for value in values])
+            elif column in self.integers and column in other.integers:
+                self.data[column].extend(other.data[column])
+            elif column in self.integers:
+                self.append_integers(column, other.column(column))
+            else:
+                self.data[column].extend(other.column(column))
+
+        self.n_rows += other.n_rows
+
+    def append_integers(self, column, values):
+        """
+        Appends values to an integer column. If a value is not an integer (or out of the range of int32), the
+        column is converted to a list of python objects (values are kept as they are).
+        """
+        data = self.data[column]
+        for i, value in enumerate(values):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                data.append(MISSING_INT)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool) and \
+                    MISSING_INT < value < 2 ** 31:
+                data.append(int(value))
+            else:
+                self.integers.discard(column)
+                self.data[column] = [v if v != MISSING_INT else np.NaN for v in data] + list(values[i:])
+                return
+
+    def code(self, column, value):
+        """
+        Returns the integer code of a value in a categorical column (-1 for missing values).
+        """
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return -1
+
+        categories = self.categories[column]
+        if value not in categories:
+            categories[value] = len(categories)
+        return categories[value]
+
+    def column(self, column, start=0):
+        """
+        Returns the (decoded) values of a column from row 'start' on as list.
+        """
+        if column not in self.data:
+            return [np.NaN] * (self.n_rows - start)
+
+        values = self.data[column][start:]
+        if column in self.categories:
+            lookup = list(self.categories[column])
+            values = [lookup[i] if i >= 0 else np.NaN for i in values]
+        elif column in self.timestamps:
+            values = [i if i != MISSING_TIME else np.NaN for i in values]
+        elif column in self.integers:
+            values = [i if i != MISSING_INT else np.NaN for i in values]
+        return list(values)
+
+    def records(self):
+        """
+        Yields all rows as dicts (column -> value), e.g. to pass the rows of one file on without pandas.
+        Time stamps are returned as datetime, missing values as NaN.
+        """
+        columns = []
+        for column in self.columns:
+            values = self.column(column)
+            if column in self.timestamps:
+                values = [TimestampDecoder.to_datetime(i) if not pd.isna(i) else np.NaN for i in values]
+            columns.append((column, values))
+
+        for i in range(self.n_rows):
+            yield {column: values[i] for column, values in columns}
+
+    def to_frame(self):
+        """
+        Materialises all collected rows as one data frame.
+        """
+        frame = dict()
+        for column in self.columns:
+            if column in self.categories:
+                lookup = list(self.categories[column])
+                values = pd.Categorical.from_codes(self.data[column], categories=lookup)
+                frame[column] = values.reorder_categories(sorted(lookup))
+            elif column in self.timestamps:
+                values = np.frombuffer(self.data[column], dtype=np.int64) if self.n_rows > 0 else np.array([], np.int64)
+                frame[column] = pd.Series(values.astype("datetime64[us]").astype("datetime64[ns]"))
+            elif column in self.integers:
+                values = np.frombuffer(self.data[column], dtype=np.int32) if self.n_rows > 0 else np.array([], np.int32)
+                frame[column] = pd.Series(pd.arrays.IntegerArray(values.copy(), values == MISSING_INT))
+            else:
+                frame[column] = pd.Series(self.data[column], dtype=object)
+
+        return pd.DataFrame(frame, columns=self.columns)
+
+    def to_state(self):
+        """
+        Returns the collected rows as plain data (dict of lists, arrays, sets and dicts), e.g. to be pickled
+        independently of the name under which this script was loaded (see from_state).
+        """
+        return {"columns": self.columns, "data": self.data, "categories": self.categories,
+                "timestamps": self.timestamps, "integers": self.integers, "n_rows": self.n_rows}
+
+    @classmethod
+    def from_state(cls, state, integers=None):
+        """
+        Restores an accumulator from plain data (see to_state).
+
+        @:param integers: function, which returns True for columns stored as integers (see __init__)
+        """
+        accumulator = cls([], integers=integers)
+        accumulator.columns = state["columns"]
+        accumulator.data = state["data"]
+        accumulator.categories = state["categories"]
+        accumulator.timestamps = state["timestamps"]
+        accumulator.integers = state["integers"]
+        accumulator.n_rows = state["n_rows"]
+        return accumulator
+
+
+def action_accumulator():
+    """
+    Returns an empty RowAccumulator for action data.
+    """
+    return RowAccumulator(ACTION_COLUMNS, categories=ACTION_CATEGORIES, timestamps=ACTION_TIMESTAMPS,
+                          integers=is_integer_action_column)
+
+
+def long_accumulator():
+    """
+    Returns an empty RowAccumulator for aggregated data (long format).
+    """
+    return RowAccumulator(LONG_COLUMNS, categories=LONG_CATEGORIES, timestamps=LONG_TIMESTAMPS)
+
+
+# -- time stamps -- #
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class TimestampDecoder:
+    """
+    Decodes time stamps of log entries (e.g., '2016-05-10T09:02:02.123+0200') into microseconds since epoch.
+    The time zone (last five characters) is ignored. The fixed layout is decoded by slicing, which is much faster
+    than datetime.strptime, and decoded time stamps are memoised (one decoder is used per file).
+    Differences between time stamps are then plain integer arithmetic (see time_delta).
+    """
+
+    def __init__(self):
+        self.cache = dict()
+
+    def __call__(self, time_stamp):
+        try:
+            return self.cache[time_stamp]
+        except KeyError:
+            value = self.cache[time_stamp] = self.decode(time_stamp)
+            return value
+
+    @staticmethod
+    def decode(time_stamp):
+        # layout: YYYY-MM-DDTHH:MM:SS.ffffff(+hhmm), fraction with 1 to 6 digits
+        if len(time_stamp) < 26 or time_stamp[19] != ".":
+            raise ValueError(f"time stamp '{time_stamp}' does not match format 'YYYY-MM-DDTHH:MM:SS.fff+hhmm'")
+
+        days = datetime.date(int(time_stamp[0:4]), int(time_stamp[5:7]), int(time_stamp[8:10])).toordinal()
+        seconds = (days - EPOCH_ORDINAL) * 86400 + int(time_stamp[11:13]) * 3600 + int(time_stamp[14:16]) * 60 \
+            + int(time_stamp[17:19])
+        fraction = time_stamp[20:-5]
+        return seconds * 1000000 + int(fraction.ljust(6, "0"))
+
+    @staticmethod
+    def to_datetime(time):
+        """
+        Converts microseconds since epoch (see decode) back to datetime (without time zone).
+        """
+        return EPOCH + datetime.timedelta(microseconds=time)
+
+    @staticmethod
+    def time_delta(time, start_time):
+        """
+        Returns seconds between two decoded time stamps.
+        """
+        return (time - start_time) / 10 ** 6
+
+
+# -- log entries -- #
+
+XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+TIME_STAMP = "cbaloggingmodel:LogEntryTimeStamp"
+
+PHASES = ("exploration", "control")
+SCORED_PHASES = frozenset(PHASES)
+
+BUTTONS_TO_IGNORE = frozenset(["Start",
+                               "End",
+                               "Reset",
+                               "$284335466347500",  # start button Handball
+                               "$335515708423800",  # start button Gardening
+                               "$284335424819300",  # end item Handball
+                               "$335515641725400"  # end item Gardening
+                               ])
+
+
+class PhaseSummary:
+    """
+    Aggregated actions of one phase (rounds, strategies and sequences), updated with each action row of this phase.
+    """
+
+    def __init__(self):
+        self.num_actions = 0
+        self.max_round = np.NaN
+        self.strategy_counts = dict()
+        self.strategies = []
+        self.actions = []
+
+    def add(self, row):
+        self.num_actions += 1
+
+        this_round = row.get("Round", np.NaN)
+        if not pd.isna(this_round) and (pd.isna(self.max_round) or this_round > self.max_round):
+            self.max_round = this_round
+
+        strategy = row.get("strategy")
+        if isinstance(strategy, str) and strategy != "nan":
+            self.strategy_counts[strategy] = self.strategy_counts.get(strategy, 0) + 1
+            self.strategies.append(strategy)
+
+        action = row.get("Action")
+        if isinstance(action, str) and action != "nan":
+            self.actions.append(action)
+
+
+class ScoringState:
+    """
+    State of scoring while iterating through the log entries of one file (rounds per phase, values of exo variables
+    and phase of each 'Execute', round of the last coded strategy, last values of the variables and a summary of the
+    actions per phase). Handlers of log entries (see LOG_ENTRY_HANDLERS) update this state.
+
+    Strategies are coded for all rounds at once after the loop (see code_strategies). Until then, actions refer
+    to the index of the last 'Execute' (strategy_round); None = no round yet, -1 = no strategy (NaN).
+    """
+
+    def __init__(self, exo_variables):
+        self.exo_variables = exo_variables
+        self.rounds = {phase: 0 for phase in PHASES}
+        self.exo_rounds = []
+        self.round_phases = []
+        self.strategy_round = None
+        self.last_values = dict()
+        self.summaries = {phase: PhaseSummary() for phase in PHASES}
+
+    def add_row(self, row):
+        """
+        Adds an action row to the summary of its phase.
+        """
+        if row.get("Phase") in self.summaries:
+            self.summaries[row["Phase"]].add(row)
+
+
+def handle_press_apply(entry, row, state):
+    """
+    'Execute' in exploration or control phase: counts rounds, stores values of exo + endo variables and collects
+    the values of exo variables for coding of strategies.
+    """
+    phase = row["Phase"]
+    if phase in SCORED_PHASES and row["SpecificAction"] == "Execute":
+        state.rounds[phase] += 1
+
+        # store values for exo + endo variables (last values are kept for scoring of control phase)
+        for variable in entry.iter("variable"):
+            row[variable.attrib["userDefinedId"]] = int(variable.attrib["value"])
+            state.last_values[variable.attrib["userDefinedId"]] = int(variable.attrib["value"])
+
+        # collect values for coding of STRATEGIES (see code_strategies)
+        state.exo_rounds.append([row[exo] for exo in state.exo_variables])
+        state.round_phases.append(phase)
+        state.strategy_round = len(state.exo_rounds) - 1
+
+
+def handle_change_dependency(entry, row, state):
+    """
+    Dependency was added or removed in exploration phase.
+    """
+    state.strategy_round = -1
+
+    if row["Phase"] == "exploration":
+        source = entry.attrib["sourceId"]
+        destination = entry.attrib["destinationId"]
+        row["ChangeDependency"] = source + "->" + destination
+
+
+# types of log entries (xsi:type) which are coded as actions -> (name of action, handler)
+LOG_ENTRY_HANDLERS = {
+    "cbaloggingmodel:MicroDynButtonPressLogEntry": ("PressApply", handle_press_apply),
+    "cbaloggingmodel:MicroDynAddDependencyLogEntry": ("AddDependency", handle_change_dependency),
+    "cbaloggingmodel:MicroDynRemoveDependencyLogEntry": ("RemoveDependency", handle_change_dependency),
+    "cbaloggingmodel:ButtonLogEntry": ("PressButton", None)
+}
+
+
+def code_strategies(exo_values):
+    """
+    Codes the strategies of all rounds of one file at once.
+
+    @:param exo_values: 2-D int array with values of exo variables (rounds x exo variables)
+    @:return: array with one strategy per round ("NOTAT", "VOTAT", "CA", "HOTAT" or NaN)
+    """
+    max_len = exo_values.shape[1]
+    num_zeros = np.count_nonzero(exo_values == 0, axis=1)
+
+    # first matching condition is used (same order as in rounds coded one by one)
+    conditions = [num_zeros == max_len,
+                  num_zeros == max_len - 1,
+                  num_zeros == 0,
+                  (num_zeros == 1) & (max_len > 2)]
+    strategies = np.select(conditions, ["NOTAT", "VOTAT", "CA", "HOTAT"], default="")
+
+    strategies = strategies.astype(object)
+    strategies[strategies == ""] = np.NaN
+    return strategies
+
+
+def count_votat_variables(exo_values, strategies, round_phases):
+    """
+    Counts on how many (distinct) exo variables VOTAT was applied in exploration phase.
+
+    @:param exo_values: 2-D int array with values of exo variables (rounds x exo variables)
+    @:param strategies: strategy per round (see code_strategies)
+    @:param round_phases: phase per round
+    """
+    votat = (strategies == "VOTAT") & (np.asarray(round_phases, dtype=object) == "exploration")
+    return np.count_nonzero(np.absolute(exo_values[votat]).sum(axis=0))
+
+
+def register_log_entry(entry_type, action, handler=None):
+    """
+    Registers a further type of log entry (e.g., from other CBA ItemBuilder items), which is then coded as action.
+
+    @:param entry_type: xsi:type of the log entry (e.g., "cbaloggingmodel:ComboBoxLogEntry")
+    @:param action: name of the action in the action data
+    @:param handler: optional function handler(entry, row, state) to add further values to the row of the action
+                     (see handle_press_apply); without handler the strategy of the last round is kept
+    """
+    LOG_ENTRY_HANDLERS[entry_type] = (action, handler)
+
+
+# -- item models -- #
+
+class ItemModel:
+    """
+    Static definition of an item from its designMicrodynModel: variables (exo, endo), variables with eigendynamic
+    (addend != 0), 'real' dependencies (factor != 1, incl. eigendynamic) and target values of the control phase.
+    A definition is shared by all files of the item (see ItemModelCache), hence it must not be modified.
+    """
+
+    def __init__(self, task, model, fingerprint):
+        self.task = task
+        self.fingerprint = fingerprint
+
+        # variables, eigendynamic and thresholds of endo variables
+        variables = []
+        ed_list = []
+        self.target_values = dict()
+        self.target_limits = dict()
+
+        for variable in model.iter("variable"):
+            name = variable.attrib["userDefinedId"]
+            variables.append(name)
+
+            if variable.attrib["addend"] != "0":
+                ed_list.append(variable.attrib["id"])
+
+            if "Endo" in name:
+                self.target_values[name] = int(variable.attrib["targetValue"])
+                self.target_limits[name] = int(variable.attrib["targetLimit"])
+
+        self.exo_variables = tuple(i for i in variables if "Exo" in i)
+        self.endo_variables = tuple(i for i in variables if "Endo" in i)
+        self.ed_list = tuple(ed_list)
+
+        # correct dependencies ("real" dependencies with factor != 1 and dependencies for eigendynamic)
+        dependencies = [dependency.attrib["sourceId"] + "->" + dependency.attrib["targetId"]
+                        for dependency in model.iter("dependency") if float(dependency.attrib["factor"]) != 1]
+        dependencies.extend(dependency_ed + "->" + dependency_ed for dependency_ed in ed_list)
+
+        self.dependencies = tuple(dependencies)
+        self.correct_dependencies = frozenset(dependencies)
+
+
+class ItemModelCache:
+    """
+    Item models (see ItemModel) by item (entryPoint) and fingerprint of the designMicrodynModel (hash of its xml),
+    hence the model of an item is built once (per process) instead of once per file. If the model of an item
+    changes (e.g., a new version of the item), the new fingerprint is a new entry (see RunStats for reporting).
+    """
+
+    def __init__(self):
+        self.models = dict()
+
+    @staticmethod
+    def fingerprint(model):
+        # exclusive canonical xml: same fingerprint for the whole tree (etree) and a copy of the element (iterparse)
+        return hashlib.sha256(etree.tostring(model, method="c14n", exclusive=True)).hexdigest()[:16]
+
+    def get(self, task, model):
+        fingerprint = self.fingerprint(model)
+        key = (task, fingerprint)
+
+        if key not in self.models:
+            self.models[key] = ItemModel(task, model, fingerprint)
+        return self.models[key]
+
+
+ITEM_MODELS = ItemModelCache()
+
+
+# -- reading xml-files -- #
+
+class EtreeLog:
+    """
+    Access to the parts of an xml-file, which are needed for scoring. The whole file is loaded as tree (DOM).
+
+    properties: attributes of the first log entry (user, test, entryPoint)
+    model: designMicrodynModel of the item
+    start_time_stamp: time stamp of the start of the item
+    end_model: runtimeMicrodynModel (given response in exploration phase)
+    end_data: attributes of the microdynOverview (time on task, number of resets)
+    entries(): all log entries (and their descendants) in document order
+    """
+
+    def __init__(self, source):
+        self.tree = etree.parse(source)
+        self.properties = self.tree.xpath("tracesOverview/logEntry/logEntry")[0].attrib
+        self.model = self.tree.xpath("tracesOverview/logEntry/logEntry/designMicrodynModel")[0]
+        self.start_time_stamp = self.tree.xpath("tracesOverview/logEntry")[2].attrib['timeStamp']
+        self.end_model = self.tree.xpath("tracesOverview/logEntry/logEntry/runtimeMicrodynModel")[0]
+        self.end_data = self.tree.xpath("microdynOverview")[0].attrib
+
+    def entries(self):
+        for logEntry in self.tree.xpath("tracesOverview/logEntry"):
+            for entry in logEntry.iter():
+                yield entry
+
+
+class StreamedLog:
+    """
+    Same parts of an xml-file as in EtreeLog, but read event-driven with lxml.etree.iterparse. Only elements with
+    the tags defined in 'tags' are reported and log entries are cleared once they are consumed, hence memory
+    does not grow with the size of the file.
+
+    Time stamps are reported at the start of their element and all other log entries at the end of their element
+    (i.e., when their children, e.g. the variables of an 'Execute', are parsed). The properties and the model are
+    read ahead before entries() yields the first log entry. The start time stamp, end_model and end_data are
+    available once all entries were consumed.
+    """
+
+    tags = ("logEntry", "designMicrodynModel", "runtimeMicrodynModel", "microdynOverview")
+
+    def __init__(self, source):
+        self.properties = None
+        self.model = None
+        self.start_time_stamp = None
+        self.end_model = None
+        self.end_data = None
+
+        self._stream = self._read(source)
+        self._pending = []
+        self._read_ahead = True
+
+        # read ahead until properties and model of the item are known
+        while self.properties is None or self.model is None:
+            entry = next(self._stream, None)
+            if entry is None:
+                break
+            self._pending.append(entry)
+
+        self._read_ahead = False
+
+    def entries(self):
+        pending, self._pending = self._pending, []
+        yield from pending
+        yield from self._stream
+
+    def _read(self, source):
+        num_top_level = 0
+
+        for event, elem in etree.iterparse(source, events=("start", "end"), tag=self.tags):
+            parent = elem.getparent()
+            top_level = _has_ancestors(elem, "tracesOverview")
+
+            if elem.tag == "logEntry":
+                is_time_stamp = elem.get(XSI_TYPE) == TIME_STAMP
+
+                if event == "start":
+                    # start time is taken from the third log entry (see EtreeLog)
+                    if top_level:
+                        if num_top_level == 2:
+                            self.start_time_stamp = elem.attrib['timeStamp']
+                        num_top_level += 1
+
+                    elif self.properties is None and _has_ancestors(elem, "logEntry", "tracesOverview"):
+                        self.properties = dict(elem.attrib)
+
+                    if is_time_stamp:
+                        yield elem
+
+                else:
+                    if not is_time_stamp:
+                        yield elem
+
+                    # free memory of consumed log entries (not while reading ahead, entries are still pending)
+                    if top_level and not self._read_ahead:
+                        elem.clear()
+                        while elem.getprevious() is not None:
+                            del parent[0]
+
+            elif elem.tag == "microdynOverview":
+                if event == "start" and self.end_data is None and parent is not None and parent.getparent() is None:
+                    self.end_data = dict(elem.attrib)
+
+            elif event == "end" and _has_ancestors(elem, "logEntry", "logEntry", "tracesOverview"):
+                if elem.tag == "designMicrodynModel" and self.model is None:
+                    self.model = copy.deepcopy(elem)
+                elif elem.tag == "runtimeMicrodynModel" and self.end_model is None:
+                    self.end_model = copy.deepcopy(elem)
+
+        if self.start_time_stamp is None or self.end_model is None or self.end_data is None:
+            raise ValueError("incomplete xml-file: start time, runtimeMicrodynModel or microdynOverview is missing")
+
+
+def _has_ancestors(elem, *tags):
+    """
+    Checks whether the parent, grandparent, ... of an element have the given tags.
+    """
+    for tag in tags:
+        elem = elem.getparent()
+        if elem is None or elem.tag != tag:
+            return False
+    return True
+
+
+# engines to read xml-files
+ENGINES = {"etree": EtreeLog,
+           "iterparse": StreamedLog}
+
+# xml-files in archives are named '[path of archive]::[name of member]'
+ARCHIVE_SEPARATOR = "::"
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# number of files read ahead per thread (see prefetch_sources)
+PREFETCH_PER_THREAD = 4
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def archive_members(archive, pattern="*_scoring.xml"):
+    """
+    Returns the xml-files in a zip or tar archive (named '[archive]::[member]', in the order of the archive).
+    """
+    if archive.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as f:
+            names = [info.filename for info in f.infolist() if not info.is_dir()]
+    else:
+        with tarfile.open(archive) as f:
+            names = [member.name for member in f.getmembers() if member.isfile()]
+
+    return [archive + ARCHIVE_SEPARATOR + name for name in names if fnmatch.fnmatch(os.path.basename(name), pattern)]
+
+
+def list_xml_files(path, pattern="*_scoring.xml"):
+    """
+    Returns the xml-files in a directory (incl. the xml-files in zip or tar archives in this directory) or in
+    an archive.
+    """
+    if os.path.isfile(path) and is_archive(path):
+        return archive_members(path, pattern)
+
+    files = glob.glob(os.path.join(path, pattern))
+    for archive in sorted(glob.glob(os.path.join(path, "*"))):
+        if os.path.isfile(archive) and is_archive(archive):
+            files.extend(archive_members(archive, pattern))
+    return files
+
+
+def list_input_files(data_dir, inp):
+    """
+    Returns the xml-files of one or several input paths in the data directory (see list_xml_files), each file once.
+    Files are sorted by file name (then path), hence the order (and the order of rows in the output files) does not
+    depend on the file system, e.g. on different nodes of a sharded run (see XmlParser.select_shard).
+
+    @:param inp: input path or list of input paths (e.g., one folder per study)
+    """
+    inputs = [inp] if isinstance(inp, str) else list(inp)
+    files = dict.fromkeys(path for this_input in inputs for path in list_xml_files(os.path.join(data_dir, this_input)))
+    return sorted(files, key=lambda path: (os.path.basename(path), path))
+
+
+class SourceReader:
+    """
+    Reads the content (bytes) of xml-files, which are either files or members of zip or tar archives
+    ('[archive]::[member]'). Archives are opened once and kept open until close(); reads of members of one
+    archive are serialised (archive handles are not thread-safe), reads of files are not.
+    """
+
+    def __init__(self):
+        self.archives = dict()
+        self.lock = threading.Lock()
+
+    def read(self, path):
+        if ARCHIVE_SEPARATOR not in path:
+            with open(path, "rb") as f:
+                return f.read()
+
+        archive_path, member = path.split(ARCHIVE_SEPARATOR, 1)
+
+        with self.lock:
+            if archive_path not in self.archives:
+                if archive_path.lower().endswith(".zip"):
+                    archive = zipfile.ZipFile(archive_path)
+                else:
+                    archive = tarfile.open(archive_path)
+                self.archives[archive_path] = (archive, threading.Lock())
+            archive, archive_lock = self.archives[archive_path]
+
+        with archive_lock:
+            if isinstance(archive, zipfile.ZipFile):
+                return archive.read(member)
+            return archive.extractfile(member).read()
+
+    def close(self):
+        for archive, _ in self.archives.values():
+            archive.close()
+        self.archives = dict()
+
+
+def prefetch_sources(paths, threads=4):
+    """
+    Reads files (or members of archives) on a thread pool ahead of parsing, so that reading (e.g., from a network
+    file system) overlaps with parsing. Yields (path, content) in the given order; if a file could not be read,
+    content is the exception. At most PREFETCH_PER_THREAD files per thread are read ahead.
+    """
+    reader = SourceReader()
+    pending = collections.deque()
+
+    def read(path):
+        try:
+            return reader.read(path)
+        except Exception as error:
+            return error
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=threads) as pool:
+            for path in paths:
+                pending.append((path, pool.submit(read, path)))
+
+                if len(pending) >= PREFETCH_PER_THREAD * threads:
+                    path, future = pending.popleft()
+                    yield path, future.result()
+
+            while pending:
+                path, future = pending.popleft()
+                yield path, future.result()
+    finally:
+        reader.close()
+
+
+class FileResult:
+    """
+    Result of parsing one xml-file (one user x one item): rows for actions and aggregated data (long format).
+    If the file could not be parsed, 'error' holds the error message and no rows are stored.
+    'timings' holds the time (seconds) of the stages of parse_xml_file (see FILE_STAGES), 'model_fingerprint'
+    the fingerprint of the item model (see ItemModelCache) and 'num_bytes' the size of the parsed xml-file.
+    """
+
+    def __init__(self, path, user=None, task=None, test=None, actions=None, long=None, error=None, timings=None,
+                 model_fingerprint=None, num_bytes=0):
+        self.path = path
+        self.user = user
+        self.task = task
+        self.test = test
+        self.actions = actions
+        self.long = long
+        self.error = error
+        self.timings = timings if timings is not None else dict()
+        self.model_fingerprint = model_fingerprint
+        self.num_bytes = num_bytes
+
+    def to_frames(self):
+        """
+        Returns data frames of actions and aggregated data (long format) of this file.
+        """
+        return self.actions.to_frame(), self.long.to_frame()
+
+    def to_state(self):
+        """
+        Returns this result as plain data (see RowAccumulator.to_state). Results are stored on disk (cache,
+        checkpoints, shards) in this form, hence they can be loaded by the script as well as by library users, which
+        load this script under another module name.
+        """
+        return {"path": self.path, "user": self.user, "task": self.task, "test": self.test,
+                "actions": self.actions.to_state() if self.actions is not None else None,
+                "long": self.long.to_state() if self.long is not None else None,
+                "error": self.error, "timings": self.timings, "model_fingerprint": self.model_fingerprint,
+                "num_bytes": self.num_bytes}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restores a result from plain data (see to_state).
+        """
+        actions = state["actions"]
+        long = state["long"]
+        return cls(state["path"], user=state["user"], task=state["task"], test=state["test"],
+                   actions=RowAccumulator.from_state(actions, integers=is_integer_action_column)
+                   if actions is not None else None,
+                   long=RowAccumulator.from_state(long) if long is not None else None,
+                   error=state["error"], timings=state["timings"], model_fingerprint=state["model_fingerprint"],
+                   num_bytes=state.get("num_bytes", 0))
+
+
+# errors of loading pickles of another version of the parser (or of a corrupt file), see ResultCache.get
+# (pickle.UnpicklingError is added where caught, as pickle is imported on first use)
+UNPICKLING_ERRORS = (AttributeError, ImportError, KeyError, TypeError, ValueError, EOFError)
+
+
+class ResultCache:
+    """
+    On-disk cache of parsed files. A manifest stores size, modification time and content hash (sha256) of each
+    file and results (FileResult) are stored as pickle shards named by the content hash. Unchanged files are
+    loaded from the cache instead of being parsed again.
+
+    The manifest is bound to a cache key, which is derived from SCORING_VERSION and the definitions of log entries
+    (LOG_ENTRY_HANDLERS, BUTTONS_TO_IGNORE). If the key changes, all cached results are invalid.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.pkl")
+        self.shard_directory = os.path.join(directory, "shards")
+        self.key = self.cache_key()
+        self.files = dict()
+        self._hashes = dict()
+
+        os.makedirs(self.shard_directory, exist_ok=True)
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "rb") as f:
+                manifest = pickle.load(f)
+            if manifest.get("key") == self.key:
+                self.files = manifest["files"]
+            else:
+                print("# cache was created with another version of the parser, all files will be parsed")
+
+    @staticmethod
+    def cache_key():
+        definitions = [SCORING_VERSION,
+                       sorted((entry_type, action, getattr(handler, "__name__", None))
+                              for entry_type, (action, handler) in LOG_ENTRY_HANDLERS.items()),
+                       sorted(BUTTONS_TO_IGNORE)]
+        return hashlib.sha256(repr(definitions).encode()).hexdigest()
+
+    @staticmethod
+    def file_hash(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, path):
+        """
+        Returns the cached FileResult of a file or None if the file is new or was modified.
+        Members of archives are not cached.
+        """
+        if ARCHIVE_SEPARATOR in path:
+            return None
+
+        entry = self.files.get(path)
+        stat = os.stat(path)
+
+        # size and modification time unchanged -> content is assumed to be unchanged
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            digest = entry["hash"]
+        else:
+            digest = self._hashes[path] = self.file_hash(path)
+            if entry is None or entry["hash"] != digest:
+                return None
+            entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime_ns
+
+        shard = os.path.join(self.shard_directory, digest + ".pkl")
+        if not os.path.exists(shard):
+            return None
+
+        # results, which cannot be loaded, are parsed again
+        try:
+            with open(shard, "rb") as f:
+                result = FileResult.from_state(pickle.load(f))
+        except (pickle.UnpicklingError, *UNPICKLING_ERRORS):
+            return None
+        result.path = path
+        return result
+
+    def put(self, path, result):
+        """
+        Stores the FileResult of a parsed file.
+        """
+        if ARCHIVE_SEPARATOR in path:
+            return
+
+        stat = os.stat(path)
+        digest = self._hashes.pop(path, None) or self.file_hash(path)
+
+        with open(os.path.join(self.shard_directory, digest + ".pkl"), "wb") as f:
+            pickle.dump(result.to_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.files[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest}
+
+    def save(self):
+        """
+        Writes the manifest (to a temporary file first, so that an interrupted run does not corrupt it).
+        """
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"key": self.key, "files": self.files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.manifest_path)
+
+
+# number of completed files between two checkpoints of resumed or retried runs without 'checkpoint_every'
+# (see Checkpoint)
+CHECKPOINT_EVERY = 500
+
+
+class Checkpoint:
+    """
+    Checkpoints of a run of the XmlParser: results (FileResult) of completed files, incl. files which could not be
+    parsed, are appended to a directory (e.g., out/.checkpoint) every 'every' files. Each checkpoint is a new
+    segment (pickle), hence writing a checkpoint costs only the results since the last one. An interrupted run can
+    be resumed: results of files, which were not modified since, are loaded (see load) and only the other files are
+    parsed. Checkpoints are bound to the cache key (see ResultCache.cache_key). With every=0, results are only
+    written at the end of a run (see XmlParser.parse_all_files: runs with failed files).
+    """
+
+    def __init__(self, directory, every=CHECKPOINT_EVERY, resume=False):
+        """
+        @:param directory: directory of the checkpoint segments
+        @:param every: number of completed files between two checkpoints (0 = only written by write)
+        @:param resume: keep the segments of a former run (otherwise, they are removed)
+        """
+        self.directory = directory
+        self.every = every
+        self.key = ResultCache.cache_key()
+        self.pending = []
+
+        if not resume:
+            self.remove()
+        self.num_segments = len(glob.glob(os.path.join(directory, "segment-*.pkl")))
+
+    @staticmethod
+    def signature(path):
+        """
+        Returns size and modification time of a file (of the archive for files in archives).
+        """
+        stat = os.stat(path.split(ARCHIVE_SEPARATOR)[0])
+        return stat.st_size, stat.st_mtime_ns
+
+    def load(self):
+        """
+        Returns the results of all checkpoints (dict: path -> FileResult). Results of files, which were modified
+        or removed since, are skipped.
+        """
+        results = dict()
+        for segment in sorted(glob.glob(os.path.join(self.directory, "segment-*.pkl"))):
+            try:
+                with open(segment, "rb") as f:
+                    payload = pickle.load(f)
+            except (pickle.UnpicklingError, *UNPICKLING_ERRORS):
+                print(f"# checkpoint {segment} cannot be loaded, its files will be parsed")
+                continue
+            if payload["key"] != self.key:
+                print("# checkpoint was created with another version of the parser, all files will be parsed")
+                return dict()
+
+            for path, signature, state in payload["results"]:
+                try:
+                    if self.signature(path) == signature:
+                        results[path] = FileResult.from_state(state)
+                except OSError:
+                    continue
+        return results
+
+    def add(self, path, result):
+        """
+        Adds the result of a completed file; writes a checkpoint every 'every' files.
+        """
+        self.pending.append((path, self.signature(path), result.to_state()))
+        if 0 < self.every <= len(self.pending):
+            self.write()
+
+    def write(self):
+        """
+        Writes the results since the last checkpoint as new segment (to a temporary file first, so that an
+        interrupted run does not leave a corrupt segment).
+        """
+        if len(self.pending) == 0:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"segment-{self.num_segments:05d}.pkl")
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump({"key": self.key, "results": self.pending}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+        self.num_segments += 1
+        self.pending = []
+
+    def remove(self):
+        """
+        Removes all checkpoints (e.g., after the output files of a run were written).
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def write_quarantine(path, errors):
+    """
+    Writes the files, which could not be parsed, with their exceptions as *.csv file (columns: path, error and
+    traceback). An existing file is removed if there are no errors.
+
+    @:param errors: list of (path, error) with error as in FileResult.error ('[type]: [message]' and traceback)
+    """
+    if len(errors) == 0:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["path", "error", "traceback"])
+        for file_path, error in errors:
+            message, _, trace = error.partition("\n")
+            writer.writerow([file_path, message, trace.strip()])
+
+
+def read_quarantine(path):
+    """
+    Returns the paths of the files in a quarantine file (see write_quarantine).
+    """
+    return read_info_column(path, "path") if os.path.exists(path) else []
+
+
+class ActionShardWriter:
+    """
+    Streaming writer for the action data. Rows of parsed files are buffered and, once 'buffer_rows' rows are
+    buffered, written as sorted shard (pickle) to a directory. At the end, all shards are merged (k-way merge) into
+    one output sorted by ID, Item and TimeAfterOnset (same order and format as sorting and writing the whole data
+    frame). Hence, memory is bounded by the buffer (and one chunk per shard while merging).
+    """
+
+    chunk_rows = 5000
+
+    def __init__(self, directory, buffer_rows=100000):
+        """
+        @:param directory: directory for the shards (removed by close())
+        @:param buffer_rows: maximum number of buffered rows before a shard is written
+        """
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        self.buffer = action_accumulator()
+        self.columns = list(ACTION_COLUMNS)
+        self.shards = []
+        self.n_rows = 0
+
+        # needed to format dates and times as pandas does for the whole column (see format_row)
+        self.show_time = False
+        self.show_ms = False
+        self.show_us = False
+        self.float_times = False
+
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+
+    def add(self, rows):
+        """
+        Adds the action rows (RowAccumulator) of one file.
+        """
+        for column in rows.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    @staticmethod
+    def sort_key(this_id, item, time, number):
+        # same order as sort_values(by=["ID", "Item", "TimeAfterOnset"]), missing times last, stable
+        time = np.NaN if time is None else float(time)
+        return this_id, item, np.isnan(time), 0.0 if np.isnan(time) else time, number
+
+    def flush(self):
+        """
+        Writes all buffered rows as one sorted shard.
+        """
+        if len(self.buffer) == 0:
+            return
+
+        columns = self.buffer.columns
+        rows = list(zip(*[self.buffer.column(column) for column in columns]))
+
+        id_index, item_index, time_index, date_index = [columns.index(i) for i in
+                                                        ["ID", "Item", "TimeAfterOnset", "Date"]]
+        keys = [self.sort_key(row[id_index], row[item_index], row[time_index], self.n_rows + number)
+                for number, row in enumerate(rows)]
+
+        for row in rows:
+            time = row[time_index]
+            if isinstance(time, float) and not np.isnan(time):
+                self.float_times = True
+
+            date = row[date_index]
+            if not pd.isna(date):
+                self.show_time = self.show_time or date % (86400 * 10 ** 6) != 0
+                self.show_ms = self.show_ms or date % 10 ** 6 != 0
+                self.show_us = self.show_us or date % 1000 != 0
+
+        order = sorted(range(len(rows)), key=keys.__getitem__)
+
+        path = os.path.join(self.directory, f"shard_{len(self.shards):05d}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(columns, f, protocol=pickle.HIGHEST_PROTOCOL)
+            for start in range(0, len(order), self.chunk_rows):
+                chunk = [(keys[i], rows[i]) for i in order[start:start + self.chunk_rows]]
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.shards.append(path)
+        self.n_rows += len(rows)
+        self.buffer = action_accumulator()
+
+    def read_shard(self, path):
+        """
+        Yields (key, row) of a shard, rows with values in the order of all columns (self.columns).
+        """
+        with open(path, "rb") as f:
+            columns = pickle.load(f)
+            positions = [columns.index(column) if column in columns else None for column in self.columns]
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                for key, row in chunk:
+                    yield key, tuple(row[i] if i is not None else np.NaN for i in positions)
+
+    def merge(self):
+        """
+        Yields all rows (tuples in the order of self.columns) sorted by ID, Item and TimeAfterOnset.
+        """
+        self.flush()
+        for key, row in heapq.merge(*[self.read_shard(path) for path in self.shards], key=lambda x: x[0]):
+            yield row
+
+    def format_row(self, row):
+        """
+        Formats values as pandas does in to_csv (dates with the precision needed for the whole column).
+        """
+        values = []
+        for column, value in zip(self.columns, row):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                values.append("")
+            elif column == "Date":
+                values.append(self.format_date(value))
+            elif column == "TimeAfterOnset":
+                values.append(repr(float(value)) if self.float_times else str(int(value)))
+            else:
+                values.append(str(value))
+        return values
+
+    def format_date(self, value):
+        date = datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=value)
+        if not self.show_time:
+            return date.strftime("%Y-%m-%d")
+        text = date.strftime("%Y-%m-%d %H:%M:%S")
+        if self.show_us:
+            return text + ".%06d" % date.microsecond
+        if self.show_ms:
+            return text + ".%03d" % (date.microsecond // 1000)
+        return text
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(self.columns)
+            for row in self.merge():
+                writer.writerow(self.format_row(row))
+
+    def write_columnar(self, path, output_format, partition_cols=None):
+        """
+        Writes the merged rows chunk by chunk as parquet or feather (see write_columnar).
+        """
+        if os.path.exists(path):
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+
+        rows = self.merge()
+        chunk_number = 0
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_rows * 10))
+            if len(chunk) == 0:
+                break
+
+            df = pd.DataFrame(chunk, columns=self.columns)
+            df["Date"] = pd.to_datetime(df["Date"], unit="us")
+            write_columnar(apply_schema(df, ACTION_SCHEMA), path, output_format, partition_cols=partition_cols,
+                           part=chunk_number)
+            chunk_number += 1
+
+    def close(self):
+        """
+        Removes all shards.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class WideLayout:
+    """
+    Column layout of the aggregated data in wide format: one column per item, phase and value, named
+    'item_value_phase' (e.g., 'Lemonade_Rounds_exploration'), grouped by item and phase.
+    """
+
+    def __init__(self, items, values, phases=PHASES):
+        self.items = list(items)
+        self.values = list(values)
+        self.phases = list(phases)
+        self.columns = []
+        self.offsets = dict()
+
+        for item in self.items:
+            for phase in self.phases:
+                self.offsets[(item, phase)] = len(self.columns)
+                self.columns.extend([f"{item}_{value}_{phase}" for value in self.values])
+
+
+def sort_actions(df_actions):
+    """
+    Sorts action data by ID, item and time after onset (order of the actions data file).
+    """
+    df_actions["TimeAfterOnset"] = pd.to_numeric(df_actions["TimeAfterOnset"])
+    df_actions.sort_values(by=["ID", "Item", "TimeAfterOnset"], inplace=True)
+    return df_actions
+
+
+def build_wide(df_long, items=None):
+    """
+    Converts the aggregated data from long format (one row per ID, item and phase) to wide format (one row per ID).
+    Values are not aggregated, hence non-numeric columns (e.g., StratSeq, ActionSeq) are kept. All values are
+    filled into a preallocated array in one pass over the rows in long format.
+
+    @:param df_long: aggregated data in long format
+    @:param items: items (tasks) in the order of the columns (None = all items in df_long, sorted)
+    """
+    values = [column for column in df_long.columns if column not in ("ID", "Item", "Phase", "Test", "Date")]
+
+    ids = df_long["ID"].to_numpy(dtype=object)
+    item_values = df_long["Item"].to_numpy(dtype=object)
+    phase_values = df_long["Phase"].to_numpy(dtype=object)
+
+    if items is None:
+        items = sorted(set(item_values))
+    layout = WideLayout(items, values)
+
+    participants = sorted(set(ids))
+    row_index = {participant: i for i, participant in enumerate(participants)}
+
+    # positions of each row in long format in the wide array (rows of items not in layout are skipped)
+    offsets = np.array([layout.offsets.get((item, phase), -1) for item, phase in zip(item_values, phase_values)],
+                       dtype=np.int64)
+    rows = np.array([row_index[i] for i in ids], dtype=np.int64)
+    in_layout = offsets >= 0
+
+    # first column is the ID (inserting it afterwards would fragment the data frame)
+    data = np.full((len(participants), len(layout.columns) + 1), np.NaN, dtype=object)
+    data[:, 0] = participants
+    for k, value in enumerate(values):
+        data[rows[in_layout], offsets[in_layout] + k + 1] = df_long[value].to_numpy(dtype=object)[in_layout]
+
+    return pd.DataFrame(data, columns=["ID"] + layout.columns).infer_objects()
+
+
+def arrow_schema(df):
+    """
+    Returns a pyarrow schema for a data frame with dtypes as defined by apply_schema. Categories are stored as
+    dictionary of strings, thus the schema is the same for all chunks of a data frame (see ActionShardWriter).
+    """
+    import pyarrow
+
+    types = {"category": pyarrow.dictionary(pyarrow.int32(), pyarrow.string()), "string": pyarrow.string(),
+             "boolean": pyarrow.bool_(), "Int8": pyarrow.int8(), "Int16": pyarrow.int16(),
+             "Int32": pyarrow.int32(), "Int64": pyarrow.int64(), "float32": pyarrow.float32(),
+             "float64": pyarrow.float64(), "datetime64[ns]": pyarrow.timestamp("ns")}
+    return pyarrow.schema([(column, types.get(str(df[column].dtype), pyarrow.string())) for column in df.columns])
+
+
+def apply_schema(df, schema):
+    """
+    Returns a copy of a data frame with explicit dtypes (see ACTION_SCHEMA and LONG_SCHEMA). Values of exo and
+    endo variables are stored as nullable integers, all other columns not defined in the schema are kept.
+    """
+    df = df.copy()
+    for column in df.columns:
+        dtype = schema.get(column)
+        if dtype is None and (column.startswith("Exo") or column.startswith("Endo")):
+            dtype = VARIABLE_DTYPE
+
+        if dtype is None:
+            continue
+        elif dtype == "category" or dtype == "string":
+            df[column] = df[column].astype(dtype)
+        elif dtype == "boolean":
+            df[column] = df[column].astype("object").where(df[column].notna(), None).astype(dtype)
+        elif dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(df[column])
+        else:
+            df[column] = pd.to_numeric(df[column].astype("object")).astype(dtype)
+
+    return df
+
+
+def write_columnar(df, path, output_format, partition_cols=None, part=None):
+    """
+    Writes a data frame as parquet or feather file. If partition columns are given, a directory with one file per
+    partition (e.g., 'Test=.../Item=.../') is written instead, hence single partitions can be read separately.
+    Requires the package pyarrow.
+
+    @:param part: number of a chunk of a data frame written in several parts (only with partition columns)
+    """
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ImportError(f"output format '{output_format}' requires the package pyarrow (conda install pyarrow)")
+
+    if part is None:
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    else:
+        # explicit schema, so that all parts have the same schema
+        for column in df.columns:
+            if df[column].dtype == object:
+                df[column] = df[column].astype("string")
+        table = pyarrow.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+
+    if partition_cols:
+        options = dict()
+        if part is not None:
+            options["basename_template"] = f"part-{part}-{{i}}." + ("arrow" if output_format == "feather" else
+                                                                    output_format)
+        pyarrow.dataset.write_dataset(table, path, format="ipc" if output_format == "feather" else output_format,
+                                      partitioning=partition_cols, partitioning_flavor="hive",
+                                      existing_data_behavior="delete_matching" if part is None else
+                                      "overwrite_or_ignore", **options)
+    elif output_format == "feather":
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, path)
+    else:
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, path)
+
+
+def write_frame(df, path, output_formats, schema, partition_cols=None):
+    """
+    Writes a data frame in all given output formats (see XmlParser.write_data_frame).
+
+    @:param path: path of the output file without extension
+    """
+    for output_format in output_formats:
+        if output_format == "csv":
+            df.to_csv(path + ".csv", index=False)
+        else:
+            write_columnar(apply_schema(df, schema), path + "." + output_format, output_format,
+                           partition_cols=partition_cols)
+
+
+def file_name_tokens(path):
+    """
+    Splits the name of an xml-file (e.g., 'data/study/12345_Lemonade_scoring.xml') at '_' and returns all
+    sequences of consecutive tokens (e.g., '12345', 'Lemonade', '12345_Lemonade'). IDs and tasks are matched
+    exactly against these tokens, hence also IDs or tasks containing '_' are found, but IDs which are prefixes
+    of other IDs are not mixed up.
+    """
+    name = os.path.basename(path)
+    if name.endswith("_scoring.xml"):
+        name = name[:-len("_scoring.xml")]
+
+    parts = name.split("_")
+    return {"_".join(parts[i:j]) for i in range(len(parts)) for j in range(i + 1, len(parts) + 1)}
+
+
+def select_files(files, cases=None, tasks=None):
+    """
+    Selects xml-files of the given cases (IDs) and tasks. Each file is included once (in the given order).
+    Lookups are done in sets, hence selection is linear in the number of files (also for large lists of IDs).
+
+    @:param files: paths of xml-files
+    @:param cases: IDs to include (None = all IDs)
+    @:param tasks: tasks to include (None = all tasks)
+    """
+    cases = None if cases is None else frozenset(str(i) for i in cases)
+    tasks = None if tasks is None else frozenset(str(i) for i in tasks)
+
+    use_these_files = []
+    seen = set()
+
+    for this_file in files:
+        tokens = file_name_tokens(this_file)
+
+        # select tasks and/or cases
+        if tasks is not None and tokens.isdisjoint(tasks):
+            continue
+        if cases is not None and tokens.isdisjoint(cases):
+            continue
+
+        if this_file not in seen:
+            seen.add(this_file)
+            use_these_files.append(this_file)
+
+    return use_these_files
+
+
+def read_info_column(path, column):
+    """
+    Reads one column of a *.csv file in the info folder (e.g., 'ID' of IDs.csv) as strings; empty cells are skipped.
+    Same values as with pandas.read_csv(path, dtype=str), but without importing pandas (see select in the CLI).
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [row[column] for row in csv.DictReader(f) if row.get(column)]
+
+
+def select_study_files(inp="", task_file="tasks", subset_cases=False, subset_tasks=True, data_dir="data",
+                       info_dir="info"):
+    """
+    Returns the xml-files, which are parsed by the XmlParser with the same parameters (see XmlParser.__init__),
+    in the same order. 'inp' can be one input path or a list of input paths.
+    """
+    cases = read_info_column(os.path.join(info_dir, "IDs.csv"), "ID") if subset_cases else None
+    tasks = read_info_column(os.path.join(info_dir, task_file + ".csv"), "tasks") if subset_tasks else None
+    files = list_input_files(data_dir, inp)
+
+    if cases is None and tasks is None:
+        return files
+    return select_files(files, cases=cases, tasks=tasks)
+
+
+# -- instrumentation -- #
+
+# stages of parse_xml_file (timed per file) and of a run of the XmlParser
+FILE_STAGES = ("load", "model", "events", "strategies", "exploration", "control", "aggregate")
+RUN_STAGES = ("select", "parse", "save")
+
+# upper edges of the bins of histograms of per-file times (milliseconds), the last bin is open
+HISTOGRAM_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class StageTimer:
+    """
+    Measures the time of consecutive stages: lap(stage) adds the time since the last lap (or since the timer was
+    created) to the stage. If a stage is timed several times, times are summed up.
+    """
+
+    def __init__(self):
+        self.times = dict()
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.times[stage] = self.times.get(stage, 0.0) + now - self.last
+        self.last = now
+
+
+class RunStats:
+    """
+    Timers and counters of a run of the XmlParser: time of the stages of the run (see RUN_STAGES), time of the
+    stages of each parsed file (see FILE_STAGES) and counters of files, events (rows of action data) and bytes.
+    Per-file times are summarised as percentiles and histograms (see HISTOGRAM_EDGES_MS).
+    """
+
+    def __init__(self):
+        self.timer = StageTimer()
+        self.counters = {"files": 0, "parsed": 0, "cached": 0, "failed": 0, "events": 0, "bytes": 0}
+        self.file_times = {stage: [] for stage in FILE_STAGES}
+        self.files = []
+        self.profiles = []
+        self.item_models = dict()
+
+    def add_file(self, result, cached=False):
+        """
+        Counts one file. Per-file times are only kept for files parsed in this run (not for cached files).
+        """
+        self.counters["files"] += 1
+
+        if result.error is not None:
+            self.counters["failed"] += 1
+            return
+
+        events = len(result.actions)
+        self.counters["events"] += events
+
+        # files per item and version of the item model (results in old caches have no fingerprint)
+        fingerprint = getattr(result, "model_fingerprint", None)
+        versions = self.item_models.setdefault(result.task, dict())
+        if fingerprint not in versions:
+            versions[fingerprint] = {"files": 0, "example": result.path}
+        versions[fingerprint]["files"] += 1
+
+        self.counters["bytes"] += result.num_bytes
+
+        if cached:
+            self.counters["cached"] += 1
+            return
+
+        self.counters["parsed"] += 1
+        for stage in FILE_STAGES:
+            self.file_times[stage].append(result.timings.get(stage, 0.0))
+        self.files.append((sum(result.timings.values()), result.path, events))
+
+    def model_mismatches(self):
+        """
+        Returns the items with more than one item model (different designMicrodynModel in different files).
+        """
+        return {task: versions for task, versions in self.item_models.items() if len(versions) > 1}
+
+    def slowest(self, n):
+        """
+        Returns (seconds, path, events) of the n slowest parsed files.
+        """
+        return sorted(self.files, key=lambda file: file[0], reverse=True)[:n]
+
+    @staticmethod
+    def distribution(seconds):
+        """
+        Summarises per-file times: total (seconds), mean, percentiles and maximum (milliseconds) and histogram.
+        """
+        ms = np.array(seconds, dtype=np.float64) * 1000
+        bins = [0, *HISTOGRAM_EDGES_MS, np.inf]
+        labels = [f"<{edge}" for edge in HISTOGRAM_EDGES_MS] + [f">={HISTOGRAM_EDGES_MS[-1]}"]
+        counts = np.histogram(ms, bins=bins)[0]
+
+        if len(ms) == 0:
+            return {"total_s": 0.0, "mean_ms": None, "p50_ms": None, "p90_ms": None, "p99_ms": None,
+                    "max_ms": None, "histogram_ms": dict(zip(labels, counts.tolist()))}
+
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99]).tolist()
+        return {"total_s": float(ms.sum()) / 1000, "mean_ms": float(ms.mean()), "p50_ms": p50, "p90_ms": p90,
+                "p99_ms": p99, "max_ms": float(ms.max()), "histogram_ms": dict(zip(labels, counts.tolist()))}
+
+    def summary(self):
+        """
+        Returns the run summary as dict (see save).
+        """
+        parse_time = self.timer.times.get("parse", 0.0)
+        return {"stages_s": {stage: self.timer.times.get(stage, 0.0) for stage in RUN_STAGES},
+                "counters": dict(self.counters),
+                "files_per_s": self.counters["files"] / parse_time if parse_time > 0 else None,
+                "events_per_s": self.counters["events"] / parse_time if parse_time > 0 else None,
+                "file_stages": {stage: self.distribution(times) for stage, times in self.file_times.items()},
+                "total_per_file": self.distribution([file[0] for file in self.files]),
+                "slowest_files": [{"path": path, "seconds": seconds, "events": events} for seconds, path, events in
+                                  self.slowest(10)],
+                "item_models": self.item_models,
+                "model_mismatches": sorted(self.model_mismatches()),
+                "profiles": self.profiles}
+
+    def report(self):
+        """
+        Prints the run summary.
+        """
+        summary = self.summary()
+        counters = summary["counters"]
+
+        print("--- RUN SUMMARY ---")
+        for stage, seconds in summary["stages_s"].items():
+            print(f"{stage:<12} {seconds:>10.3f} s")
+
+        print(f"files: {counters['files']} (parsed {counters['parsed']}, cached {counters['cached']}, "
+              f"failed {counters['failed']}), events: {counters['events']}, {counters['bytes'] / 1024 ** 2:.1f} MB")
+        if summary["files_per_s"] is not None:
+            print(f"{summary['files_per_s']:.1f} files/s, {summary['events_per_s']:.0f} events/s")
+
+        if counters["parsed"] > 0:
+            print(f"\n{'stage per file':<14} {'total [s]':>10} {'mean [ms]':>10} {'p50 [ms]':>10} {'p90 [ms]':>10} "
+                  f"{'p99 [ms]':>10} {'max [ms]':>10}")
+            for stage, stats in list(summary["file_stages"].items()) + [("total", summary["total_per_file"])]:
+                print(f"{stage:<14} {stats['total_s']:>10.3f} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f} "
+                      f"{stats['p90_ms']:>10.2f} {stats['p99_ms']:>10.2f} {stats['max_ms']:>10.2f}")
+
+            print("\nhistogram of time per file [ms]:",
+                  ", ".join(f"{label}: {count}" for label, count in summary["total_per_file"]["histogram_ms"].items()
+                            if count > 0))
+
+            print("slowest files:")
+            for file in summary["slowest_files"][:5]:
+                print(f"  {file['seconds'] * 1000:>10.2f} ms  {file['events']:>6} events  {file['path']}")
+
+        for task, versions in self.model_mismatches().items():
+            print(f"# WARNING: item {task} has {len(versions)} different models (designMicrodynModel):")
+            for fingerprint, version in versions.items():
+                print(f"  {fingerprint}: {version['files']} files, e.g. {version['example']}")
+        print("\n")
+
+    def save(self, path):
+        """
+        Writes the run summary as JSON file.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def profile_file(path, directory, engine="etree"):
+    """
+    Parses one xml-file with cProfile and (in a second pass) with tracemalloc. Writes the profile
+    ('[file name].prof', e.g. for pstats or snakeviz) and a report ('[file name].txt') with the functions with
+    most cumulative time and the lines with most allocated memory to 'directory'.
+
+    @:return: dict with path, peak memory (MB) and paths of the written files
+    """
+    import cProfile
+    import contextlib
+    import io
+    import pstats
+    import tracemalloc
+
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    name = os.path.join(directory, os.path.splitext(os.path.basename(path))[0])
+
+    # members of archives ('[archive]::[member]') are read before profiling
+    content = None
+    if ARCHIVE_SEPARATOR in path:
+        reader = SourceReader()
+        try:
+            content = reader.read(path)
+        finally:
+            reader.close()
+
+    # output of parse_xml_file was already printed in the run
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        parse_xml_file(path, engine=engine, content=content)
+        profiler.disable()
+
+        tracemalloc.start()
+        parse_xml_file(path, engine=engine, content=content)
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    profiler.dump_stats(name + ".prof")
+
+    with open(name + ".txt", "w") as f:
+        f.write(f"{path}\n\n")
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(25)
+        f.write(f"peak memory: {peak / 1024 ** 2:.2f} MB\n\nlines with most allocated memory:\n")
+        for stat in snapshot.statistics("lineno")[:15]:
+            f.write(f"{stat}\n")
+
+    return {"path": path, "peak_memory_mb": peak / 1024 ** 2, "profile": name + ".prof", "report": name + ".txt"}
+
+
+def shard_of(path, num_shards):
+    """
+    Returns the shard (0 to num_shards - 1) of an xml-file. The shard is a stable hash of the file name (i.e., of ID
+    and item), hence it is the same on all nodes, in all processes and independent of the directory of the file.
+    """
+    key = os.path.basename(path).encode()
+    return int(hashlib.sha256(key).hexdigest(), 16) % num_shards
+
+
+def parse_shard(text):
+    """
+    Converts 'i/N' (e.g., '0/4' = first of four shards) into (i, N).
+    """
+    shard, num_shards = (int(i) for i in text.split("/"))
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in 0 to {num_shards - 1}, got {shard}")
+    return shard, num_shards
+
+
+class StudyRows:
+    """
+    Rows of the files of one test (study) in multi-study mode (see XmlParser, by_test): accumulators for action
+    data (or a streaming writer, see ActionShardWriter) and aggregated data.
+    """
+
+    def __init__(self, test, stream_directory=None):
+        """
+        @:param test: test attribute of the files (see parse_xml_file)
+        @:param stream_directory: directory for the shards of streamed action data (None = actions kept in memory)
+        """
+        self.test = test
+        self.long = long_accumulator()
+        self.actions = action_accumulator()
+        self.action_writer = ActionShardWriter(stream_directory) if stream_directory is not None else None
+        self.num_files = 0
+
+    def add_long(self, result):
+        self.num_files += 1
+        self.long.extend(result.long)
+
+    def add_actions(self, result):
+        if self.action_writer is not None:
+            self.action_writer.add(result.actions)
+        else:
+            self.actions.extend(result.actions)
+
+
+class XmlParser:
+
+    def __init__(self, inp="", out="out", task_file="tasks", verbose=True, subset_cases=False, subset_tasks=True, wide=False,
+                 workers=1, engine="etree", cache_dir=None, output_format="csv", stream_actions=False, stats_file=None,
+                 profile_slowest=0, data_dir="data", info_dir="info", prefetch=0, shard=None, merge=False,
+                 checkpoint_every=0, resume=False, retry_failed=False, by_test=False):
+        """
+        @:param inp: specified input path of xml-files (or list of input paths, e.g. one folder per study)
+        @:param out: specified out path of data frames
+        @:param verbose: specify whether action data should be stored
+        @:param workers: number of processes used to parse the xml-files (1 = no multi-processing)
+        @:param engine: engine to read xml-files, "etree" (whole tree) or "iterparse" (streamed, less memory)
+        @:param cache_dir: directory to cache parsed files; unchanged files are not parsed again (None = no cache)
+        @:param output_format: format(s) of output files: "csv", "parquet" and/or "feather" (e.g., ["csv", "parquet"])
+        @:param stream_actions: write action data to sorted shards while parsing instead of keeping them in memory
+        @:param stats_file: path of a JSON file for the run summary (timers and counters, see RunStats)
+        @:param profile_slowest: number of slowest files, which are parsed again with cProfile and tracemalloc
+                                 (profiles are stored in out/profiles)
+        @:param data_dir: directory of the input paths (inp)
+        @:param info_dir: directory of IDs.csv and the task file
+        @:param prefetch: number of threads reading xml-files ahead of parsing (0 = files are read by the parser)
+        @:param shard: (i, N) to parse only the i-th of N shards of the files (see shard_of); results are stored in
+                       out/.shards and combined with merge
+        @:param merge: combine the results of all shards in out/.shards instead of parsing files (see merge_shards)
+        @:param checkpoint_every: write a checkpoint of completed files to out/.checkpoint every N files (0 = only at
+                                  the end of runs with failed files)
+        @:param resume: continue an interrupted run from its last checkpoint (only files not in it are parsed)
+        @:param retry_failed: parse only the files in the quarantine of the last run again (and, after an interrupted
+                              run, the files not in its checkpoint); results of the other files are loaded from the
+                              checkpoint, which is kept after runs with failed files. Without checkpoint, the run
+                              stops before output files are written.
+        @:param by_test: multi-study mode: files are grouped by their test attribute and one set of output files
+                         is written per test (named after the test); all files are parsed in one run (one pool)
+
+        """
+
+        self.relevant_data_points = []
+        self.subset_tasks = subset_tasks
+        self.task_file = task_file
+        self.wide = wide
+        self.subset_cases = subset_cases
+        self.verbose = verbose
+        self.out = out
+        self.input = inp
+        self.test_description = None
+        self.df_cases = None
+        self.df_tasks = None
+        self.workers = workers
+        self.engine = engine
+        self.cache = ResultCache(cache_dir) if cache_dir is not None else None
+        self.output_formats = [output_format] if isinstance(output_format, str) else list(output_format)
+        self.failed_files = []
+        self.errors = dict()
+        self.stats_file = stats_file
+        self.profile_slowest = profile_slowest
+        self.data_dir = data_dir
+        self.info_dir = info_dir
+        self.prefetch = prefetch
+        self.shard = shard
+        self.merge = merge
+        self.shard_directory = os.path.join(self.out, ".shards")
+        self.shard_results = []
+        self.file_index = dict()
+        self.by_test = by_test
+        self.studies = dict()
+
+        if shard is not None and merge:
+            raise ValueError("a run is either one shard or the merge of all shards")
+
+        # checkpoints and quarantine (files which could not be parsed) of this run or of this shard
+        name = f"-shard-{shard[0]}-of-{shard[1]}" if shard is not None else ""
+        self.quarantine_file = os.path.join(self.out, f"quarantine{name}.csv")
+        self.retry_failed = retry_failed
+        # runs with failed files are always checkpointed at their end, so that these files can be retried
+        self.checkpoint = None
+        if not merge:
+            if checkpoint_every == 0 and (resume or retry_failed):
+                checkpoint_every = CHECKPOINT_EVERY
+            self.checkpoint = Checkpoint(os.path.join(self.out, f".checkpoint{name}"), every=checkpoint_every,
+                                         resume=resume or retry_failed)
+
+        for this_format in self.output_formats:
+            if this_format not in OUTPUT_FORMATS:
+                raise ValueError(f"unknown output format '{this_format}', use one of {list(OUTPUT_FORMATS)}")
+
+        # STEP 0a -> df for action stream
+        self.actionDfColumns = ACTION_COLUMNS
+        self.actions = action_accumulator()
+        self.df_actions = None
+        self.action_writer = None
+        self.stream_actions = self.verbose and stream_actions
+        # shard runs keep their results for the merge (see collect), which streams the action data
+        if self.stream_actions and not by_test and shard is None:
+            self.action_writer = ActionShardWriter(os.path.join(self.out, ".actions_shards"))
+
+        # STEP 0b -> df for aggregated data
+        self.dfLongColumns = LONG_COLUMNS
+        self.long = long_accumulator()
+        self.df_long = None
+
+        # timers and counters of this run
+        self.stats = RunStats()
+
+        # STEP 1a -> get all files in path(s) (and in zip/tar archives in this path, or in the archive 'inp')
+        # (files are not needed to merge shards)
+        self.allFiles = list_input_files(self.data_dir, self.input) if not self.merge else []
+
+        # STEP 1b -> if subset of cases/tasks for analyses is desired, only include them
+        if self.subset_cases or self.subset_tasks:
+            self.include_these_files()
+
+        # STEP 1c -> in a sharded run, only include files of this shard
+        if self.shard is not None:
+            self.select_shard()
+        self.stats.timer.lap("select")
+
+        # STEP 2 -> parse all files (or load results of all shards)
+        if self.merge:
+            self.merge_shards()
+        else:
+            self.parse_all_files()
+        self.stats.timer.lap("parse")
+
+        # STEP 3 -> save files (or results of this shard); files which could not be parsed are quarantined first
+        write_quarantine(self.quarantine_file, [(path, self.errors[path]) for path in self.failed_files])
+        if self.shard is not None:
+            self.save_shard()
+        elif self.by_test:
+            self.save_studies()
+        elif self.test_description is None:
+            print(f"# none of {len(self.allFiles)} files could be parsed, see {self.quarantine_file}")
+        else:
+            self.save_data_frames()
+        self.stats.timer.lap("save")
+
+        # outputs are complete, checkpoints are only needed to retry failed files
+        if self.checkpoint is not None and len(self.failed_files) == 0:
+            self.checkpoint.remove()
+        elif self.checkpoint is not None:
+            print(f"# checkpoint kept in {self.checkpoint.directory}, parse only the failed files again with "
+                  f"retry_failed=True (--retry-failed)")
+
+        # STEP 4 -> run summary (and profiles of slowest files)
+        if self.profile_slowest > 0:
+            self.profile_slowest_files()
+
+        self.stats.report()
+        if self.stats_file is not None:
+            self.stats.save(self.stats_file)
+
+    # -- helper functions for steps 1 to 3 -- #
+
+    # Parse all files
+    def parse_all_files(self):
+        """
+        Loops through all files defined in self.allFiles in __init__ and parses each file (see parse_files).
+        Files which are in the cache (if defined) are loaded instead. Results are collected in the order of
+        self.allFiles (i.e., output is the same as in a serial run without cache).
+        """
+
+        if len(self.allFiles) == 0 and self.shard is None:
+            print("""
+            Based on your definitions in both ID.csv and/or tasks.csv no datapoints could be selected.
+            Please redefine your specifications in these files or set "subset_clases" and/or "subset_tasks" to "False".
+            """)
+
+            print("# finished at", datetime.datetime.now().time())
+            sys.exit(1)
+
+        else:
+            # files in cache are not parsed again
+            cached = dict()
+            if self.cache is not None:
+                for path in self.allFiles:
+                    result = self.cache.get(path)
+                    if result is not None:
+                        cached[path] = result
+                print(f"# {len(cached)} of {len(self.allFiles)} files loaded from cache")
+
+            # files in the checkpoint of an interrupted run are not parsed again (quarantined files only if retried)
+            if self.checkpoint is not None:
+                resumed = self.checkpoint.load()
+                if self.retry_failed:
+                    # without checkpoint, output files would only contain the retried files
+                    if len(resumed) == 0:
+                        print(f"# no checkpoint in {self.checkpoint.directory}, failed files cannot be retried "
+                              f"without overwriting the output files; run again without retry_failed "
+                              f"(--retry-failed)")
+                        print("# finished at", datetime.datetime.now().time())
+                        sys.exit(1)
+
+                    quarantined = set(read_quarantine(self.quarantine_file))
+                    resumed = {path: result for path, result in resumed.items()
+                               if result.error is None and path not in quarantined}
+                resumed = {path: resumed[path] for path in self.allFiles if path in resumed and path not in cached}
+                cached.update(resumed)
+                if len(resumed) > 0:
+                    print(f"# {len(resumed)} of {len(self.allFiles)} files loaded from checkpoint")
+
+            # results are collected in the order of self.allFiles
+            parsed = self.parse_files([path for path in self.allFiles if path not in cached])
+
+            try:
+                for path in self.allFiles:
+                    if path in cached:
+                        self.stats.add_file(cached[path], cached=True)
+                        if cached[path].error is not None:
+                            self.add_failure(cached[path])
+                            continue
+                        self.collect(cached[path])
+                        continue
+
+                    result = next(parsed)
+                    self.stats.add_file(result)
+                    if self.checkpoint is not None:
+                        self.checkpoint.add(path, result)
+
+                    # skip files which could not be parsed
+                    if result.error is not None:
+                        print(f"###### FAILED: {result.path} #######", result.error, sep="\n")
+                        self.add_failure(result)
+                        continue
+
+                    if self.cache is not None:
+                        self.cache.put(path, result)
+                    self.collect(result)
+
+            finally:
+                # also if the run is interrupted (e.g., Ctrl+C or a crashed worker process); without checkpoint_every
+                # only if files could not be parsed (see retry_failed)
+                if self.checkpoint is not None and (self.checkpoint.every > 0 or len(self.failed_files) > 0):
+                    self.checkpoint.write()
+                if self.cache is not None:
+                    self.cache.save()
+
+            if len(self.failed_files) > 0:
+                print(f"# {len(self.failed_files)} of {len(self.allFiles)} files could not be parsed:",
+                      *self.failed_files, sep="\n")
+
+    def add_failure(self, result):
+        """
+        Adds a file, which could not be parsed, to the failed files (see write_quarantine).
+        """
+        self.failed_files.append(result.path)
+        self.errors[result.path] = result.error
+
+    def profile_slowest_files(self):
+        """
+        Parses the slowest files of this run again with cProfile and tracemalloc (see profile_file).
+        """
+        directory = os.path.join(self.out, "profiles")
+
+        for seconds, path, events in self.stats.slowest(self.profile_slowest):
+            profile = profile_file(path, directory, engine=self.engine)
+            profile["seconds"] = seconds
+            self.stats.profiles.append(profile)
+            print(f"# profile of {path} ({seconds * 1000:.1f} ms, peak memory {profile['peak_memory_mb']:.2f} MB):",
+                  profile["report"])
+
+    def parse_files(self, files):
+        """
+        Parses the given files and yields one FileResult per file (in the given order), see parse_files.
+        Errors are returned with the result (also in a serial run), hence failed files are quarantined.
+        """
+        return parse_files(files, engine=self.engine, workers=self.workers, skip_errors=True, prefetch=self.prefetch)
+
+    # save data frame
+    def save_data_frames(self):
+        """
+        Saves all data frames and also call function long_to_wide to convert long df in wide df.
+        Data frames are materialised here (once) from the row accumulators filled in collect.
+        """
+        self.df_long = self.long.to_frame()
+        if self.action_writer is None:
+            self.df_actions = self.actions.to_frame()
+
+        # check directory and create if not existing
+        if not os.path.exists(self.out):
+            os.makedirs(self.out)
+
+        # save all data frames
+        self.write_data_frame(self.df_long, "_aggregated_long", LONG_SCHEMA)
+
+        if self.wide:
+            self.long_to_wide()
+            self.write_data_frame(self.df_wide, "_aggregated_wide", dict())
+
+        if self.verbose and self.action_writer is not None:
+            self.write_streamed_actions()
+
+        elif self.verbose:
+            sort_actions(self.df_actions)
+            self.write_data_frame(self.df_actions, "_actions", ACTION_SCHEMA, partition_cols=["Test", "Item"])
+
+    def save_studies(self):
+        """
+        Saves one set of data frames per test in multi-study mode (see save_data_frames), named after the test.
+        """
+        for test, study in self.studies.items():
+            print(f"# test {test}: {study.num_files} files")
+            self.test_description = test
+            self.long, self.actions, self.action_writer = study.long, study.actions, study.action_writer
+            self.save_data_frames()
+
+        # shards of streamed action data of all tests (see collect)
+        if self.stream_actions:
+            shutil.rmtree(os.path.join(self.out, ".actions_shards"), ignore_errors=True)
+
+    def write_streamed_actions(self):
+        """
+        Merges the shards of the streaming writer into the action files (in all defined output formats).
+        """
+        for output_format in self.output_formats:
+            path = self.out + os.sep + self.test_description + "_actions." + output_format
+
+            if output_format == "csv":
+                self.action_writer.write_csv(path)
+            else:
+                self.action_writer.write_columnar(path, output_format, partition_cols=["Test", "Item"])
+
+        self.action_writer.close()
+
+    def write_data_frame(self, df, name, schema, partition_cols=None):
+        """
+        Writes a data frame in all defined output formats. CSV files are written as they are, parquet and feather
+        files with explicit dtypes (see apply_schema). Partition columns are only used for parquet and feather.
+
+        @:param name: suffix of the file name (after the test description)
+        """
+        write_frame(df, self.out + os.sep + self.test_description + name, self.output_formats, schema,
+                    partition_cols=partition_cols)
+
+    # convert dfLong to dfWide
+    def long_to_wide(self):
+        """
+        Converts df_long to df_wide (see build_wide). If tasks are defined in tasks.csv, items are in this order.
+        """
+        items = None
+        if self.df_tasks is not None:
+            items = list(dict.fromkeys(str(i) for i in self.df_tasks["tasks"].values))
+
+        # in multi-study mode, only items of this test
+        if self.by_test and items is not None:
+            present = set(str(i) for i in self.df_long["Item"].unique())
+            items = [item for item in items if item in present]
+
+        self.df_wide = build_wide(self.df_long, items=items)
+
+    # Select relevant IDs
+    def include_these_files(self):
+        """
+        Loads a *.csv file in which all IDs (cases) are listed (one row = one case) and only parses xml-Files
+        from these cases. Same for tasks (tasks.csv or as defined in task_file).
+        """
+
+        # get infos (IDs are read as strings, e.g. to keep leading zeros)
+        cases = None
+        tasks = None
+
+        if self.subset_cases:
+            self.df_cases = pd.read_csv(os.path.join(self.info_dir, "IDs.csv"), dtype=str)
+            cases = self.df_cases["ID"].values
+
+        if self.subset_tasks:
+            self.df_tasks = pd.read_csv(os.path.join(self.info_dir, self.task_file + ".csv"), dtype=str)
+            tasks = self.df_tasks["tasks"].values
+
+        # over-write "allFiles" with subset of selected files
+        self.allFiles = select_files(self.allFiles, cases=cases, tasks=tasks)
+
+    def select_shard(self):
+        """
+        Keeps only the files of this shard (see shard_of). The position of each file in the full selection is kept,
+        so that the results of all shards can be merged in the order of a single run (see merge_shards).
+        """
+        shard, num_shards = self.shard
+        self.file_index = {path: i for i, path in enumerate(self.allFiles)}
+        names = "\n".join(os.path.basename(path) for path in self.allFiles)
+        self.files_key = hashlib.sha256(names.encode()).hexdigest()
+        self.num_selected = len(self.allFiles)
+        self.allFiles = [path for path in self.allFiles if shard_of(path, num_shards) == shard]
+
+        print(f"# shard {shard}/{num_shards}: {len(self.allFiles)} of {self.num_selected} files")
+
+    def save_shard(self):
+        """
+        Stores the results of this shard (FileResults with their position in the full selection and failed files)
+        in out/.shards/shard-[i]-of-[N].pkl.
+        """
+        shard, num_shards = self.shard
+        if not os.path.exists(self.shard_directory):
+            os.makedirs(self.shard_directory)
+
+        payload = {"key": ResultCache.cache_key(), "shard": shard, "num_shards": num_shards,
+                   "num_files": self.num_selected,
+                   "files_key": self.files_key,
+                   "results": [(index, result.to_state()) for index, result in self.shard_results],
+                   "failed": [(self.file_index[path], path, self.errors[path]) for path in self.failed_files]}
+
+        path = os.path.join(self.shard_directory, f"shard-{shard}-of-{num_shards}.pkl")
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+        print(f"# results of shard {shard}/{num_shards} stored in {path}")
+
+    def merge_shards(self):
+        """
+        Loads the results of all shards (see save_shard) one after another and collects them as in a single run:
+        action data are collected shard by shard (and sorted when saved), aggregated data in the order of the full
+        selection. Hence, data frames are the same as in a single run, and only one shard is in memory at a time
+        (besides the collected rows). All shards must be based on the same selection of files.
+        """
+        shards = dict()
+        for path in glob.glob(os.path.join(self.shard_directory, "shard-*-of-*.pkl")):
+            match = re.fullmatch(r"shard-(\d+)-of-(\d+)\.pkl", os.path.basename(path))
+            if match is not None:
+                shards[int(match.group(1)), int(match.group(2))] = path
+
+        if len(shards) == 0:
+            raise FileNotFoundError(f"no results of shards in {self.shard_directory}")
+
+        num_shards = max(num_shards for _, num_shards in shards)
+        if any(this_num_shards != num_shards for _, this_num_shards in shards):
+            raise ValueError("results of shards with different numbers of shards, remove results of former runs")
+
+        missing = sorted(set(range(num_shards)) - {shard for shard, _ in shards})
+        if len(missing) > 0:
+            raise ValueError(f"results of shard(s) {missing} of {num_shards} are missing")
+
+        print(f"# merging the results of {num_shards} shards")
+
+        # aggregated data of all files (without action data), collected in the order of the full selection below
+        results = []
+        failed = []
+        num_files = None
+        files_key = None
+        for shard in range(num_shards):
+            path = shards[shard, num_shards]
+            try:
+                with open(path, "rb") as f:
+                    payload = pickle.load(f)
+            except (pickle.UnpicklingError, *UNPICKLING_ERRORS) as error:
+                raise ValueError(f"results of shard {path} cannot be loaded ({type(error).__name__}: {error}), "
+                                 f"parse this shard again") from error
+
+            if payload.get("key") != ResultCache.cache_key():
+                raise ValueError("results of shards were created with another version of the parser, parse them again")
+            if files_key is None:
+                num_files, files_key = payload["num_files"], payload["files_key"]
+            elif payload["files_key"] != files_key:
+                raise ValueError("shards are based on different selections of files")
+
+            for index, state in payload["results"]:
+                result = FileResult.from_state(state)
+                # counted as not parsed in this run
+                self.stats.add_file(result, cached=True)
+                self.collect_actions(result)
+                results.append((index, result, result.actions.columns))
+                result.actions = None
+            failed.extend(payload["failed"])
+            del payload
+
+        if len(results) + len(failed) != num_files:
+            raise ValueError("results of shards do not cover all files, remove results of former runs")
+
+        # columns of action data in the order of a single run (in which the first file with a column adds it)
+        results.sort(key=lambda item: item[0])
+        action_columns = collections.defaultdict(lambda: list(ACTION_COLUMNS))
+        for _, result, columns in results:
+            self.collect_long(result)
+            action_columns[result.test if self.by_test else None].extend(columns)
+
+        for test, columns in action_columns.items():
+            rows = self.study_of(test) if self.by_test else self
+            actions = rows.action_writer if rows.action_writer is not None else rows.actions
+            actions.columns = list(dict.fromkeys(columns + actions.columns))
+
+        # tests in the order of the full selection (multi-study mode)
+        if self.by_test:
+            self.studies = {test: self.studies[test] for test in action_columns}
+
+        failed.sort()
+        self.failed_files = [path for _, path, _ in failed]
+        self.errors = {path: error for _, path, error in failed}
+        if len(self.failed_files) > 0:
+            print(f"# {len(self.failed_files)} files could not be parsed:", *self.failed_files, sep="\n")
+
+    def collect(self, result):
+        """
+        Adds the rows of one parsed file (FileResult) to the accumulators for actions and aggregated data
+        (of its test in multi-study mode). In a sharded run, results are kept with their position in the full
+        selection instead (see save_shard).
+        """
+        if self.shard is not None:
+            self.shard_results.append((self.file_index[result.path], result))
+            return
+
+        self.collect_actions(result)
+        self.collect_long(result)
+
+    def collect_actions(self, result):
+        """
+        Adds the action data of one parsed file (see collect).
+        """
+        if self.by_test:
+            self.study_of(result.test).add_actions(result)
+        elif self.action_writer is not None:
+            self.action_writer.add(result.actions)
+        else:
+            self.actions.extend(result.actions)
+
+    def collect_long(self, result):
+        """
+        Adds the aggregated data of one parsed file (see collect).
+        """
+        if self.by_test:
+            self.study_of(result.test).add_long(result)
+        else:
+            self.test_description = result.test
+            self.long.extend(result.long)
+
+    def study_of(self, test):
+        """
+        Returns the rows of a test in multi-study mode (see StudyRows), created for the first file of the test.
+        """
+        if test not in self.studies:
+            stream_directory = None
+            if self.stream_actions:
+                stream_directory = os.path.join(self.out, ".actions_shards", f"test-{len(self.studies)}")
+            self.studies[test] = StudyRows(test, stream_directory)
+        return self.studies[test]
+
+
+# -- MAIN FUNCTION -- #
+
+def parse_xml_file(path, engine="etree", quiet=False, content=None):
+    """
+    Parses one xml-file (one user x one item).
+    Checks each actions and returns a FileResult with rows for both actions and aggregated data
+
+    @:param path: path of the xml-file
+    @:param engine: engine to read the xml-file, see ENGINES ("etree" loads the whole tree, "iterparse" streams it)
+    @:param quiet: do not print the scoring of the file
+    @:param content: content of the file (bytes, e.g. read by prefetch_sources); then, path is only its name
+    """
+
+    # helper functions
+    convert_time = TimestampDecoder()
+    timer = StageTimer()
+    echo = print if not quiet else _discard
+
+    # -------------------------------------------------------------------
+    # load and parse xml-file(s)
+    # -------------------------------------------------------------------
+
+    # get XML tree of the file (or a stream of its log entries)
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine '{engine}', use one of {list(ENGINES)}")
+    if isinstance(content, Exception):
+        raise content
+    log = ENGINES[engine](io.BytesIO(content) if content is not None else path)
+    timer.lap("load")
+
+    # -------------------------------------------------------------------
+    # get properties of user and task + model info
+    # -------------------------------------------------------------------
+
+    # properties
+    task = log.properties['entryPoint']
+    user = log.properties['user']
+    test = log.properties['test']
+
+    echo(f"###### STARTED: {user}, with, {task} #######")
+    echo("\n")
+
+    # rows of this file
+    action_rows = action_accumulator()
+    long_rows = long_accumulator()
+
+    # model (variables, eigendynamic, correct dependencies and thresholds), built once per item (see ItemModel)
+    item_model = ITEM_MODELS.get(task, log.model)
+
+    ed_list = item_model.ed_list
+    exo_variables = item_model.exo_variables
+    endo_variables = item_model.endo_variables
+    timer.lap("model")
+
+    # -------------------------------------------------------------------
+    # Create 'help variables'
+    # -------------------------------------------------------------------
+
+    state = ScoringState(exo_variables)
+    this_time = None
+
+    # rows of performed actions (time after onset is added when start time is known, see below) and
+    # the round of the strategy of each action
+    event_rows = []
+    strategy_rounds = []
+
+    # -------------------------------------------------------------------
+    # iterate through log entries
+    # -------------------------------------------------------------------
+
+    echo("--- STRATEGY Scoring ---")
+
+    # loop through each log entry (and its descendants) in tree
+    for entry in log.entries():
+        entry_type = entry.get(XSI_TYPE)
+
+        # get timeStamp
+        if entry_type == TIME_STAMP:
+            this_time = convert_time(entry.attrib["timeStamp"])
+            continue
+
+        # get performed actions (only pre-defined actions, see LOG_ENTRY_HANDLERS)
+        if entry_type not in LOG_ENTRY_HANDLERS:
+            continue
+
+        action, handler = LOG_ENTRY_HANDLERS[entry_type]
+
+        # try to get phase and buttons
+        get_phase = entry.get("phase")
+        get_button = entry.get("button") if entry.get("button") is not None else entry.get("id")
+
+        # avoid that 'start' and 'end' buttons are counted as actions
+        if get_button in BUTTONS_TO_IGNORE:
+            continue
+
+        # define dict for output
+        this_row = dict()
+        this_row["ID"] = user
+        this_row["Item"] = task
+        this_row["Test"] = test
+        this_row["SpecificAction"] = get_button
+        this_row["Phase"] = get_phase
+        this_row["Action"] = action
+
+        # action specific values (e.g., values of variables and strategies)
+        if handler is not None:
+            handler(entry, this_row, state)
+
+        # Store actions
+        this_row["TimeAfterOnset"] = None
+        this_row["Date"] = this_time
+        this_row["Round"] = state.rounds[get_phase] if get_phase is not None else np.NaN
+        this_row["strategy"] = None
+
+        event_rows.append(this_row)
+        strategy_rounds.append(state.strategy_round)
+
+    # (with engine "iterparse", the file is read in this loop)
+    timer.lap("events")
+
+    # code STRATEGIES of all rounds
+    exo_values = np.array(state.exo_rounds, dtype=np.int64).reshape(len(state.exo_rounds), len(exo_variables))
+    strategies = code_strategies(exo_values)
+
+    for this_exo_values, this_strategy in zip(exo_values.tolist(), strategies):
+        echo(this_exo_values, this_strategy, sep=" -> ")
+
+    # strategy of the last round is stored with each action
+    for this_row, strategy_round in zip(event_rows, strategy_rounds):
+        if strategy_round is not None:
+            this_row["strategy"] = strategies[strategy_round] if strategy_round >= 0 else np.NaN
+        state.add_row(this_row)
+
+    # -------------------------------------------------------------------
+    # add start time and time after onset to actions
+    # -------------------------------------------------------------------
+    start_time = convert_time(log.start_time_stamp)
+
+    start_row = dict()
+    start_row["ID"] = user
+    start_row["Item"] = task
+    start_row["SpecificAction"] = "START"
+    start_row["Test"] = test
+    start_row["TimeAfterOnset"] = 0
+    start_row["Date"] = start_time
+    start_row["Phase"] = "Start Test"
+    start_row["Action"] = "Start"
+    start_row["Round"] = 0
+    start_row["strategy"] = np.NaN
+
+    action_rows.append(start_row)
+
+    for this_row in event_rows:
+        if this_row["Date"] is not None:
+            this_row["TimeAfterOnset"] = convert_time.time_delta(this_row["Date"], start_time)
+        action_rows.append(this_row)
+
+    # -------------------------------------------------------------------
+    # check fullVOTAT
+    # -------------------------------------------------------------------
+    max_len = exo_values.shape[1] if len(exo_values) > 0 else None
+    votat_by_vars = count_votat_variables(exo_values, strategies, state.round_phases)
+
+    if votat_by_vars == max_len:
+        full_votat = True
+    else:
+        full_votat = False
+
+    echo(f"Number of Variables: {max_len}",
+         f"Number of Variable with VOTAT: {votat_by_vars}",
+         f"Full VOTAT application: {full_votat}",
+         "\n",
+         sep="\n")
+    timer.lap("strategies")
+
+    # -------------------------------------------------------------------
+    # check if response was correct in EXPLORATION phase + ED + num relations
+    # -------------------------------------------------------------------
+
+    # correct dependencies (incl. dependencies for eigendynamic, see ItemModel)
+    given_model_results = item_model.dependencies
+
+    # given dependencies + thresholds
+    end_model = log.end_model
+    end_model_response = []
+
+    for dependency in end_model.iter("dependency"):
+        end_model_response.append(dependency.attrib["sourceId"] + "->" + dependency.attrib["targetId"])
+
+    # check EXPLORATION
+    if set(end_model_response) == item_model.correct_dependencies:
+        correct_exploration = 1
+    else:
+        correct_exploration = 0
+
+    echo("--- EXPLORATION PHASE Scoring ---")
+    echo(f"Correct Solution {set(given_model_results)}",
+         f"Response {set(end_model_response)}",
+         f"Correct: {correct_exploration}",
+         sep="\n"
+         )
+    echo("\n")
+    timer.lap("exploration")
+
+    # -------------------------------------------------------------------
+    # check if response was correct in CONTROL phase
+    # -------------------------------------------------------------------
+
+    # get thresholds
+    threshold1 = item_model.target_values
+    threshold2 = item_model.target_limits
+
+    # get given response
+    given_control_response = dict()
+    for variable in endo_variables:
+        # get last valid value (last valid log for each ENDO value in this file)
+        # NaN if there was a bug in displaying phases and no logs were recorded
+        given_control_response[variable] = state.last_values.get(variable, np.NaN)
+
+    correct_control_partial_list = []
+
+    # compare given answer with pre-defined thresholds
+    for key, value in given_control_response.items():
+        if threshold1[key] < threshold2[key]:
+            if threshold1[key] <= value <= threshold2[key]:
+                correct_control_partial = 1
+            else:
+                correct_control_partial = 0
+        else:
+            if threshold2[key] <= value <= threshold1[key]:
+                correct_control_partial = 1
+            else:
+                correct_control_partial = 0
+
+        # store this partial solution of control phase for scoring in the next step
+        correct_control_partial_list.append(correct_control_partial)
+
+    # calculate full scoring
+    if all(elem == 1 for elem in correct_control_partial_list):
+        correct_control = 1
+    else:
+        correct_control = 0
+
+    correct = {"exploration": correct_exploration,
+               "control": correct_control}
+
+
+    # --- print output for control  ----------------------------------
+    if not quiet:
+        all_keys = list(set(given_control_response.keys()) | set(threshold1.keys()) | set(threshold2.keys()))
+
+        given_list = [given_control_response.get(key, None) for key in all_keys]
+        threshold_target_list = [threshold1.get(key, None) for key in all_keys]
+        threshold_limit_list = [threshold2.get(key, None) for key in all_keys]
+
+        print_out_control = pd.DataFrame({
+            'Response': given_list,
+            'threshold_target': threshold_target_list,
+            'threshold_limit': threshold_limit_list
+        }, index=all_keys).reindex(['EndoA', 'EndoB', 'EndoC'])
+
+        echo("--- CONTROL PHASE Scoring ---")
+        echo(print_out_control)
+        echo(f"Correct: {correct_control}")
+        echo("\n")
+    timer.lap("control")
+
+    # ------------------------------------------------------------------
+
+    # -------------------------------------------------------------------
+    # get time on task
+    # -------------------------------------------------------------------
+
+    """
+    End time is taken from microdyn overview. The Execution environment is caluclating the time on task
+    correctly (double-checked) but this is only indicated in the overview. I.e., there is not log-entry
+    when the "finish" button was pressed and the item was terminated. Hence, we use the entry from overview 
+    and we also calculate the specific time stamp by date(end) = start time + time on task. 
+    """
+
+    # time excl. instruction
+    end_data = log.end_data
+    exploration_time_no_instr = end_data["explorationTime"]
+    control_time_no_instr = end_data["controlTime"]
+
+    times_no_instr = {"exploration": exploration_time_no_instr,
+                      "control": control_time_no_instr}
+
+
+    # add end time to actions
+    end_row = dict()
+    end_row["ID"] = user
+    end_row["Item"] = task
+    end_row["Test"] = test
+    end_row["SpecificAction"] = "END"
+    end_row["TimeAfterOnset"] = exploration_time_no_instr
+    end_row["Date"] = start_time + int(exploration_time_no_instr) * 10 ** 6
+    end_row["Phase"] = "exploration"
+    end_row["Action"] = "EndExploration"
+    end_row["Round"] = np.NaN
+    end_row["strategy"] = np.NaN
+
+    action_rows.append(end_row)
+    state.add_row(end_row)
+
+    # -------------------------------------------------------------------
+    # get number of resets in exploration phase
+    # -------------------------------------------------------------------
+    exploration_resets = end_data["explorationNbReset"]
+    resets = {"exploration": exploration_resets,
+              "control": np.NaN}
+
+    # -------------------------------------------------------------------
+    # task characteristics (relations, ED)
+    # -------------------------------------------------------------------
+
+    # check eigendynamic (ED)
+    if len(ed_list) > 0:  # check whether some addend of variable is not 0
+        ed = True
+    else:
+        ed = False
+
+    # check number of dependencies (relations)
+    num_dependencies = len(given_model_results)
+
+    # ------------------------------------------------------------------
+    # build df for aggregated data (long format)
+    # ------------------------------------------------------------------
+
+    # get Data (summaries of actions of this file per phase)
+    for phase in PHASES:
+        summary = state.summaries[phase]
+
+        agg = dict()
+        agg["ID"] = user
+        agg["Item"] = task
+        agg["Date"] = start_time
+        agg["Test"] = test
+        agg["Phase"] = phase
+        agg["ED"] = ed
+        agg["NumDependencies"] = num_dependencies
+        agg["NumInput"] = len(exo_variables)
+        agg["NumOutput"] = len(endo_variables)
+        agg["Resets"] = resets[phase]
+
+        if summary.num_actions > 0:
+            agg["Rounds"] = summary.max_round
+            agg["Time_NoInstr"] = times_no_instr[phase]
+            agg["Correct"] = correct[phase]
+            agg["VOTATfreq"] = summary.strategy_counts.get("VOTAT", 0)
+            agg["HOTATfreq"] = summary.strategy_counts.get("HOTAT", 0)
+            agg["NOTATfreq"] = summary.strategy_counts.get("NOTAT", 0)
+            agg["CAfreq"] = summary.strategy_counts.get("CA", 0)
+            agg["VOTAT_x_vars"] = votat_by_vars
+            agg["fullVOTAT"] = full_votat
+            agg["StratSeq"] = "-".join(summary.strategies)
+            agg["ActionSeq"] = "-".join(summary.actions)
+
+        long_rows.append(agg)
+
+    # print task, user
+    echo(f"###### FINISHED: {user} with {task} #######")
+    echo("\n")
+    timer.lap("aggregate")
+
+    num_bytes = len(content) if content is not None else source_size(path)
+    return FileResult(path, user=user, task=task, test=test, actions=action_rows, long=long_rows,
+                      timings=timer.times, model_fingerprint=item_model.fingerprint, num_bytes=num_bytes)
+
+
+def source_size(source):
+    """
+    Returns the size in bytes of a parsed xml-file, given as path or as binary file object (0 if the size of a
+    file object is unknown, e.g. of a stream).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer().nbytes
+    try:
+        position = source.tell()
+        size = source.seek(0, io.SEEK_END)
+        source.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def _parse_chunk_worker(sources, engine="etree", quiet=False):
+    """
+    Worker function of the process pool for several files, given as (path, content) (see parse_files).
+    """
+    return [_parse_file_worker(path, engine=engine, quiet=quiet, content=content) for path, content in sources]
+
+
+def _parse_file_worker(path, engine="etree", quiet=False, content=None):
+    """
+    Worker function of the process pool (see parse_files). Errors are returned with the result
+    instead of raised, so that one corrupt xml-file does not stop the whole batch.
+    """
+    try:
+        return parse_xml_file(path, engine=engine, quiet=quiet, content=content)
+    except Exception as error:
+        return FileResult(path, error=f"{type(error).__name__}: {error}\n{traceback.format_exc()}")
+
+
+def _discard(*args, **kwargs):
+    """
+    Replaces print if output is not wanted (see parse_xml_file).
+    """
+
+
+# -- library API -- #
+
+# maximum number of files handed to a worker process at once (see parse_files)
+PARSE_CHUNK_SIZE = 32
+
+def parse_files(files, engine="etree", workers=1, quiet=False, skip_errors=False, prefetch=0):
+    """
+    Parses the given files and yields one FileResult per file (in the given order).
+    If more than one worker is defined, files are parsed in a process pool. Then, errors are always returned
+    with the result (see _parse_file_worker); in a serial run only if skip_errors is set (otherwise raised).
+
+    Files are handed to the pool in chunks and at most two chunks per worker are pending, hence results which are
+    not consumed yet do not pile up in memory (a slow consumer slows down parsing).
+
+    If prefetch is set (number of threads) or files are members of archives, files are read ahead on a thread
+    pool and their content is handed to the parser (see prefetch_sources).
+    """
+    if prefetch > 0 or any(ARCHIVE_SEPARATOR in path for path in files):
+        sources = prefetch_sources(files, threads=max(1, prefetch))
+    else:
+        sources = ((path, None) for path in files)
+
+    if workers > 1 and len(files) > 1:
+        chunk_size = max(1, min(len(files) // (workers * 4), PARSE_CHUNK_SIZE))
+        pending = collections.deque()
+
+        with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in iter(lambda: list(itertools.islice(sources, chunk_size)), []):
+                pending.append(pool.submit(_parse_chunk_worker, chunk, engine, quiet))
+
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+    else:
+        parse = _parse_file_worker if skip_errors else parse_xml_file
+        for path, content in sources:
+            yield parse(path, engine=engine, quiet=quiet, content=content)
+
+
+def parse_file(source, engine="etree", name=None):
+    """
+    Parses one xml-file without printing or writing anything. Errors are raised.
+
+    @:param source: path of the xml-file, its content (bytes) or a binary file object
+    @:param engine: engine to read the xml-file, see ENGINES
+    @:param name: name of the file stored as 'path' in the result (default: path of the file, if given)
+    @:return: FileResult with rows of actions and aggregated data (see FileResult.to_frames)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return parse_xml_file(name, engine=engine, quiet=True, content=bytes(source))
+
+    result = parse_xml_file(source, engine=engine, quiet=True)
+    if name is not None or not isinstance(source, (str, os.PathLike)):
+        result.path = name
+    return result
+
+
+def iter_results(paths, engine="etree", workers=1, cases=None, tasks=None):
+    """
+    Parses several xml-files and yields one FileResult per file as soon as it is parsed (in the order of paths).
+    Nothing is collected, printed or written: rows of each file are available as result.actions.records() and
+    result.long.records() (one row per phase) or as data frames (result.to_frames()). Files which cannot be
+    parsed are yielded with result.error set. Parsing does not run ahead of the consumer (see parse_files).
+
+    @:param paths: paths of xml-files
+    @:param engine: engine to read the xml-files, see ENGINES
+    @:param workers: number of processes used to parse the xml-files (1 = no multi-processing)
+    @:param cases: IDs to include (None = all IDs, see select_files)
+    @:param tasks: tasks to include (None = all tasks)
+    """
+    paths = select_files([os.fspath(path) for path in paths], cases=cases, tasks=tasks)
+    yield from parse_files(paths, engine=engine, workers=workers, quiet=True, skip_errors=True)
+
+
+class CorpusResult:
+    """
+    Result of parse_corpus: data frames of actions (sorted as in the actions data file), aggregated data in long
+    and wide format (wide only if requested) and the files which could not be parsed as (path, error message).
+    """
+
+    def __init__(self, actions, long, wide=None, failed=None):
+        self.actions = actions
+        self.long = long
+        self.wide = wide
+        self.failed = failed if failed is not None else []
+
+
+def parse_corpus(paths, engine="etree", workers=1, cases=None, tasks=None, actions=True, wide=False):
+    """
+    Parses several xml-files and returns data frames; nothing is printed or written and the process never exits.
+    Files which cannot be parsed are skipped and reported in CorpusResult.failed.
+
+    @:param paths: paths of xml-files
+    @:param engine: engine to read the xml-files, see ENGINES
+    @:param workers: number of processes used to parse the xml-files (1 = no multi-processing)
+    @:param cases: IDs to include (None = all IDs, see select_files)
+    @:param tasks: tasks to include (None = all tasks); also the order of items in wide format
+    @:param actions: collect action data (set False if only aggregated data are needed)
+    @:param wide: also build aggregated data in wide format
+    @:return: CorpusResult
+    """
+    action_rows = action_accumulator()
+    long_rows = long_accumulator()
+    failed = []
+
+    for result in iter_results(paths, engine=engine, workers=workers, cases=cases, tasks=tasks):
+        if result.error is not None:
+            failed.append((result.path, result.error))
+            continue
+
+        long_rows.extend(result.long)
+        if actions:
+            action_rows.extend(result.actions)
+
+    df_long = long_rows.to_frame()
+    df_actions = sort_actions(action_rows.to_frame()) if actions else None
+    df_wide = None
+    if wide:
+        items = None if tasks is None else list(dict.fromkeys(str(i) for i in tasks))
+        df_wide = build_wide(df_long, items=items)
+
+    return CorpusResult(df_actions, df_long, wide=df_wide, failed=failed)
+
+
+# -- watching a folder -- #
+
+class FolderWatcher:
+    """
+    Reports new xml-files in a directory once they are completely written. If the package inotify_simple is
+    installed (Linux), files are reported when they are closed after writing or moved into the directory.
+    Otherwise, the directory is polled and files are reported when size and modification time did not change
+    between two polls. Files in the directory at start are reported by the first call of wait().
+    """
+
+    def __init__(self, directory, pattern="*_scoring.xml", interval=0.5, use_inotify=True):
+        """
+        @:param interval: seconds between two polls (or maximum time of waiting for inotify events)
+        @:param use_inotify: use inotify if available (otherwise always poll)
+        """
+        self.directory = directory
+        self.pattern = pattern
+        self.interval = interval
+        self.known = set()
+        self.failed = dict()
+        self.candidates = dict()
+        self.inotify = None
+
+        if use_inotify:
+            try:
+                import inotify_simple
+            except ImportError:
+                inotify_simple = None
+
+            if inotify_simple is not None:
+                self.inotify = inotify_simple.INotify()
+                self.inotify.add_watch(directory, inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MOVED_TO)
+
+        # files in the directory at start (listed after the watch is added, hence no file is missed)
+        self.pending = sorted(glob.glob(os.path.join(directory, pattern)))
+
+    @property
+    def mode(self):
+        return "inotify" if self.inotify is not None else "polling"
+
+    @staticmethod
+    def signature(path):
+        """
+        Returns size and modification time of a file (None if the file does not exist).
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def wait(self, timeout=None):
+        """
+        Returns the new files (sorted). Waits until there is at least one new file or until 'timeout' seconds
+        are over (None = no timeout).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            new_files = self.poll()
+            if new_files or (deadline is not None and time.monotonic() >= deadline):
+                return new_files
+
+            if self.inotify is None:
+                time.sleep(self.interval)
+
+    def poll(self):
+        """
+        Returns the files which are new since the last call (waits at most 'interval' for inotify events).
+        """
+        files, self.pending = self.pending, []
+
+        if self.inotify is not None:
+            for event in self.inotify.read(timeout=int(self.interval * 1000)):
+                if fnmatch.fnmatch(event.name, self.pattern):
+                    files.append(os.path.join(self.directory, event.name))
+        else:
+            files.extend(self.stable_files())
+
+        new_files = []
+        for path in sorted(set(files)):
+            signature = self.signature(path)
+            if path in self.known or signature is None or signature == self.failed.get(path):
+                continue
+            self.known.add(path)
+            new_files.append(path)
+
+        return new_files
+
+    def stable_files(self):
+        """
+        Returns files (not reported yet), whose size and modification time did not change since the last poll.
+        """
+        stable = []
+        candidates = dict()
+
+        for path in glob.glob(os.path.join(self.directory, self.pattern)):
+            if path in self.known:
+                continue
+            candidates[path] = self.signature(path)
+            if candidates[path] is not None and self.candidates.get(path) == candidates[path]:
+                stable.append(path)
+
+        self.candidates = candidates
+        return stable
+
+    def retry(self, path):
+        """
+        Reports the file again once it was modified (e.g., if it could not be parsed because it was incomplete).
+        """
+        self.known.discard(path)
+        self.failed[path] = self.signature(path)
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+class StudyWatcher:
+    """
+    Long-running mode: watches data/<inp> for new xml-files and scores each new file once it is completely written
+    (see FolderWatcher). Files which are already in the folder at start are parsed first and outputs are written
+    anew.
+
+    Aggregated data are kept in memory and the files of aggregated data (long and wide) are rewritten after each
+    batch of new files. Action data are not kept: they are appended to the actions file (csv) or added as new
+    part of the dataset (parquet, feather). Hence, actions are in the order of arrival of the files.
+    """
+
+    def __init__(self, inp="", out="out", task_file="tasks", verbose=True, subset_cases=False, subset_tasks=True,
+                 wide=False, workers=1, engine="etree", cache_dir=None, output_format="csv", interval=0.5,
+                 data_dir="data", info_dir="info"):
+        """
+        @:param interval: seconds between two polls of the folder (see FolderWatcher)
+        (further parameters see XmlParser)
+        """
+        self.directory = os.path.join(data_dir, inp)
+        self.out = out
+        self.verbose = verbose
+        self.wide = wide
+        self.workers = workers
+        self.engine = engine
+        self.cache = ResultCache(cache_dir) if cache_dir is not None else None
+        self.output_formats = [output_format] if isinstance(output_format, str) else list(output_format)
+        self.watcher = FolderWatcher(self.directory, interval=interval)
+
+        for this_format in self.output_formats:
+            if this_format not in OUTPUT_FORMATS:
+                raise ValueError(f"unknown output format '{this_format}', use one of {list(OUTPUT_FORMATS)}")
+
+        # selection of cases and tasks (see XmlParser.include_these_files)
+        self.cases = None
+        self.tasks = None
+        if subset_cases:
+            self.cases = pd.read_csv(os.path.join(info_dir, "IDs.csv"), dtype=str)["ID"].values
+        if subset_tasks:
+            self.tasks = pd.read_csv(os.path.join(info_dir, task_file + ".csv"), dtype=str)["tasks"].values
+
+        # aggregated data of all files so far, columns of the actions file (csv) and number of written batches
+        self.long = long_accumulator()
+        self.test_description = None
+        self.action_columns = None
+        self.num_files = 0
+        self.num_batches = 0
+
+    def run(self, max_files=None, timeout=None):
+        """
+        Scores new files until interrupted (Ctrl+C), until 'max_files' files were scored or until no new file
+        arrived for 'timeout' seconds.
+        """
+        print(f"# watching {self.directory} ({self.watcher.mode})")
+
+        try:
+            while max_files is None or self.num_files < max_files:
+                paths = self.watcher.wait(timeout=timeout)
+                if len(paths) == 0:
+                    break
+                self.process(paths)
+
+        except KeyboardInterrupt:
+            print("# stopped")
+
+        finally:
+            self.watcher.close()
+            if self.cache is not None:
+                self.cache.save()
+
+        print(f"# {self.num_files} files scored")
+
+    def process(self, paths):
+        """
+        Parses new files (or loads them from the cache) and writes their results.
+        """
+        start = time.perf_counter()
+        paths = select_files(paths, cases=self.cases, tasks=self.tasks)
+
+        results = []
+        to_parse = []
+        for path in paths:
+            result = self.cache.get(path) if self.cache is not None else None
+            if result is not None:
+                results.append(result)
+            else:
+                to_parse.append(path)
+
+        for path, result in zip(to_parse, parse_files(to_parse, engine=self.engine, workers=self.workers, quiet=True,
+                                                      skip_errors=True)):
+            # file may be incomplete (e.g., copied in several steps), it is parsed again once it is modified
+            if result.error is not None:
+                print(f"###### FAILED: {path} #######", result.error, sep="\n")
+                self.watcher.retry(path)
+                continue
+
+            if self.cache is not None:
+                self.cache.put(path, result)
+            results.append(result)
+
+        if len(results) > 0:
+            self.write(results)
+            print(f"# {len(results)} new file(s) scored in {(time.perf_counter() - start) * 1000:.0f} ms "
+                  f"({self.num_files} files in total)")
+
+    def write(self, results):
+        """
+        Adds the results of new files to the aggregated data and writes them (see class description).
+        """
+        actions = action_accumulator()
+        for result in results:
+            self.test_description = result.test
+            self.long.extend(result.long)
+            actions.extend(result.actions)
+        self.num_files += len(results)
+
+        if not os.path.exists(self.out):
+            os.makedirs(self.out)
+        path = self.out + os.sep + self.test_description
+
+        df_long = self.long.to_frame()
+        write_frame(df_long, path + "_aggregated_long", self.output_formats, LONG_SCHEMA)
+        if self.wide:
+            items = None if self.tasks is None else list(dict.fromkeys(str(i) for i in self.tasks))
+            write_frame(build_wide(df_long, items=items), path + "_aggregated_wide", self.output_formats, dict())
+
+        if self.verbose:
+            df_actions = sort_actions(actions.to_frame())
+            for output_format in self.output_formats:
+                this_path = path + "_actions." + output_format
+
+                # outputs of former runs are replaced
+                if self.num_batches == 0 and os.path.isdir(this_path):
+                    shutil.rmtree(this_path)
+
+                if output_format == "csv":
+                    self.append_csv(df_actions, this_path)
+                else:
+                    write_columnar(apply_schema(df_actions, ACTION_SCHEMA), this_path, output_format,
+                                   partition_cols=["Test", "Item"], part=self.num_batches)
+
+        self.num_batches += 1
+
+    def append_csv(self, df, path):
+        """
+        Appends rows to the actions file (csv). If the rows have new columns (e.g., variables of another item), the
+        file is rewritten once with the extended header.
+        """
+        if self.action_columns is None:
+            self.action_columns = list(df.columns)
+            df.to_csv(path, index=False)
+            return
+
+        new_columns = [column for column in df.columns if column not in self.action_columns]
+        if len(new_columns) > 0:
+            tmp_path = path + ".tmp"
+            with open(path, newline="") as f_in, open(tmp_path, "w", newline="") as f_out:
+                reader = csv.reader(f_in)
+                writer = csv.writer(f_out)
+                next(reader)
+                writer.writerow(self.action_columns + new_columns)
+                for row in reader:
+                    writer.writerow(row + [""] * len(new_columns))
+            os.replace(tmp_path, path)
+            self.action_columns += new_columns
+
+        df.reindex(columns=self.action_columns).to_csv(path, mode="a", header=False, index=False)
+
+
+# -- command line -- #
+
+COMMANDS = ("select", "parse", "merge", "bench")
+
+
+def build_arg_parser():
+    """
+    Returns the parser of the command line: python xml-parser.py [select|parse|merge|bench] [options]
+    (without command, files are parsed).
+    """
+    study = argparse.ArgumentParser(add_help=False)
+    study.add_argument("--input", "-i", nargs="+", default=[""], metavar="DIR",
+                       help="folder(s) (or archives) of the xml-files in the data folder (default: the data folder)")
+    study.add_argument("--tasks", default="tasks", metavar="NAME",
+                       help="name of the *.csv file in the info folder with the tasks to include (default: tasks)")
+    study.add_argument("--all-tasks", action="store_true", help="include all tasks (do not read the tasks file)")
+    study.add_argument("--ids", action="store_true", help="include only the IDs listed in IDs.csv in the info folder")
+    study.add_argument("--data-dir", default="data", metavar="DIR", help="data folder (default: data)")
+    study.add_argument("--info-dir", default="info", metavar="DIR", help="info folder (default: info)")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--out", default="out", metavar="DIR", help="folder of the output files (default: out)")
+    output.add_argument("--wide", action="store_true", help="also write aggregated data in wide format")
+    output.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=["csv"],
+                        help="format(s) of output files (default: csv)")
+    output.add_argument("--by-test", action="store_true",
+                        help="multi-study mode: write one set of output files per test (test attribute of the files)")
+    output.add_argument("--stats", default=None, metavar="FILE",
+                        help="write the run summary (timers and counters) as JSON file")
+
+    parsing = argparse.ArgumentParser(add_help=False)
+    parsing.add_argument("--workers", type=int, default=1,
+                         help="number of processes used to parse the xml-files (default: 1)")
+    parsing.add_argument("--engine", choices=list(ENGINES), default="etree",
+                         help="engine to read the xml-files (default: etree)")
+    parsing.add_argument("--prefetch", type=int, default=0, metavar="THREADS",
+                         help="number of threads reading xml-files ahead of parsing (e.g., on network drives)")
+
+    arg_parser = argparse.ArgumentParser(prog="xml-parser.py",
+                                         description="Parses xml-files of MicroDYN items (CBA ItemBuilder).")
+    commands = arg_parser.add_subparsers(dest="command", metavar="command")
+
+    select = commands.add_parser("select", parents=[study],
+                                 help="list the xml-files, which would be parsed (dry run)")
+    select.add_argument("--shard", type=parse_shard, default=None, metavar="I/N",
+                        help="list only the files of shard I of N")
+    select.add_argument("--count", action="store_true", help="print only the number of files")
+
+    parse = commands.add_parser("parse", parents=[study, output, parsing], help="parse the xml-files (default)")
+    parse.add_argument("--cache", default=None, metavar="DIR",
+                       help="directory to cache parsed files, unchanged files are not parsed again")
+    parse.add_argument("--stream-actions", action="store_true",
+                       help="write action data to sorted shards while parsing (bounded memory)")
+    parse.add_argument("--shard", type=parse_shard, default=None, metavar="I/N",
+                       help="parse only shard I of N (0 <= I < N), e.g. on several nodes; see merge")
+    parse.add_argument("--checkpoint", type=int, default=0, metavar="N",
+                       help=f"write a checkpoint every N files, e.g. {CHECKPOINT_EVERY} (default: 0 = only at the end "
+                            f"of runs with failed files; {CHECKPOINT_EVERY} with --resume or --retry-failed)")
+    parse.add_argument("--resume", action="store_true",
+                       help="continue an interrupted run from its last checkpoint")
+    parse.add_argument("--retry-failed", action="store_true",
+                       help="parse only the files in the quarantine of the last run again (others from its checkpoint)")
+    parse.add_argument("--watch", action="store_true",
+                       help="keep running and score new xml-files as soon as they are written")
+    parse.add_argument("--interval", type=float, default=0.5,
+                       help="seconds between two polls of the folder in watch mode (default: 0.5)")
+    parse.add_argument("--profile-slowest", type=int, default=0, metavar="N",
+                       help="parse the N slowest files again with cProfile and tracemalloc (see out/profiles)")
+    parse.add_argument("--no-actions", action="store_true", help="do not store action data (aggregated data only)")
+
+    merge = commands.add_parser("merge", parents=[study, output],
+                                help="combine the results of all shards (parse --shard) into the output files")
+    merge.add_argument("--stream-actions", action="store_true",
+                       help="write action data to sorted shards while merging (bounded memory)")
+
+    bench = commands.add_parser("bench", parents=[study, parsing],
+                                help="parse the xml-files without writing output files and print the run summary")
+    bench.add_argument("--stats", default=None, metavar="FILE", help="write the run summary as JSON file")
+
+    return arg_parser
+
+
+def run_select(args):
+    """
+    Prints the xml-files, which would be parsed (one per line), and their number. Only the standard library is
+    used, hence this command starts fast (e.g., for job schedulers).
+    """
+    files = select_study_files(inp=args.input, task_file=args.tasks, subset_cases=args.ids,
+                               subset_tasks=not args.all_tasks, data_dir=args.data_dir, info_dir=args.info_dir)
+    num_selected = len(files)
+    if args.shard is not None:
+        shard, num_shards = args.shard
+        files = [path for path in files if shard_of(path, num_shards) == shard]
+
+    if args.count:
+        print(len(files))
+        return
+
+    for path in files:
+        print(path)
+    print(f"# {len(files)} of {num_selected} files" if args.shard is not None else f"# {len(files)} files")
+
+
+def run_bench(args):
+    """
+    Selects and parses the xml-files (as the command parse, but quiet and without writing output files) and prints
+    the run summary (see RunStats).
+    """
+    stats = RunStats()
+    files = select_study_files(inp=args.input, task_file=args.tasks, subset_cases=args.ids,
+                               subset_tasks=not args.all_tasks, data_dir=args.data_dir, info_dir=args.info_dir)
+    stats.timer.lap("select")
+
+    actions = action_accumulator()
+    long = long_accumulator()
+    for result in parse_files(files, engine=args.engine, workers=args.workers, quiet=True, skip_errors=True,
+                              prefetch=args.prefetch):
+        stats.add_file(result)
+        if result.error is None:
+            actions.extend(result.actions)
+            long.extend(result.long)
+    stats.timer.lap("parse")
+
+    sort_actions(actions.to_frame())
+    long.to_frame()
+    stats.timer.lap("save")
+
+    print(f"# bench: {len(files)} files, engine {args.engine}, {args.workers} worker(s); "
+          f"'save' is the time to build the data frames (nothing is written)")
+    stats.report()
+    if args.stats is not None:
+        stats.save(args.stats)
+
+
+def main(argv=None):
+    """
+    Runs the command line (see build_arg_parser).
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # without command (or with options only), files are parsed
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "parse")
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == "select":
+        run_select(args)
+        return
+    if args.command == "bench":
+        run_bench(args)
+        return
+
+    study = dict(inp=args.input, out=args.out, task_file=args.tasks, subset_cases=args.ids,
+                 subset_tasks=not args.all_tasks, wide=args.wide, output_format=args.format, data_dir=args.data_dir,
+                 info_dir=args.info_dir)
+
+    if args.command == "parse" and args.watch and (len(args.input) > 1 or args.by_test):
+        raise SystemExit("xml-parser.py: error: watch mode needs exactly one input folder (and one test)")
+
+    print("# start at", datetime.datetime.now().time())
+    if args.command == "merge":
+        XmlParser(merge=True, stats_file=args.stats, by_test=args.by_test, stream_actions=args.stream_actions,
+                  **study)
+    elif args.watch:
+        StudyWatcher(verbose=not args.no_actions,
+                     workers=args.workers,
+                     engine=args.engine,
+                     cache_dir=args.cache,
+                     interval=args.interval,
+                     **dict(study, inp=args.input[0])).run()
+    else:
+        XmlParser(verbose=not args.no_actions,
+                  workers=args.workers,
+                  engine=args.engine,
+                  cache_dir=args.cache,
+                  stream_actions=args.stream_actions,
+                  prefetch=args.prefetch,
+                  shard=args.shard,
+                  stats_file=args.stats,
+                  profile_slowest=args.profile_slowest,
+                  checkpoint_every=args.checkpoint,
+                  resume=args.resume,
+                  retry_failed=args.retry_failed,
+                  by_test=args.by_test,
+                  **study)
+    print("# finished at", datetime.datetime.now().time())
+
+
+if __name__ == '__main__':
+    main()